@@ -113,12 +113,42 @@ def client(db_conn: sqlite3.Connection, sample_games):  # noqa: F811
     """TestClient with the get_db dependency overridden to use in-memory DB."""
     # Import here so DATABASE_PATH patching in main doesn't break other tests
     from web.main import app
-    from web.dependencies import get_db
+    from web.dependencies import get_db, get_read_db
 
     def override_get_db():
         yield db_conn
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     with TestClient(app) as tc:
         yield tc
     app.dependency_overrides.clear()
+
+
+def _drain_connection_pools() -> None:
+    """Close the idle pooled connections so none outlive a temp database."""
+    from web.database import _pools
+
+    for pool in _pools.values():
+        while not pool.empty():
+            pool.get_nowait().close()
+
+
+@pytest.fixture
+def temp_db_path(tmp_path, monkeypatch):
+    """Point the app's DATABASE_PATH at a throwaway file for one test."""
+    import web.database
+    import web.services.database_builder
+    import web.services.jobs
+    from web.services.settings import clear_settings_cache
+
+    path = tmp_path / "game_library.db"
+    monkeypatch.setattr(web.database, "DATABASE_PATH", path)
+    monkeypatch.setattr(web.services.database_builder, "DATABASE_PATH", path)
+    monkeypatch.setattr(web.services.jobs, "_jobs_table_ready", False)
+    monkeypatch.setattr(web.services.database_builder, "_ensured_games_columns", set())
+    _drain_connection_pools()
+    clear_settings_cache()
+    yield path
+    _drain_connection_pools()
+    clear_settings_cache()
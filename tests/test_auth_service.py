@@ -0,0 +1,114 @@
+"""tests/test_auth_service.py
+
+Tests for the auth tables migration and session expiry.
+"""
+
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from web.database import connect
+from web.services import auth_service
+
+
+@pytest.fixture
+def local_timezone():
+    """Run with a non-UTC local time zone, as session expiry was stored in local time."""
+    previous = os.environ.get("TZ")
+    os.environ["TZ"] = "America/New_York"
+    time.tzset()
+    yield
+    if previous is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = previous
+    time.tzset()
+
+
+@pytest.fixture
+def legacy_sessions(temp_db_path, local_timezone, monkeypatch):
+    """A database from before expires_at_ts, with one live and one expired session."""
+    monkeypatch.setattr(auth_service, "_auth_tables_ready", False)
+    now = datetime.now().replace(microsecond=0)
+    expiries = {
+        "live": (now + timedelta(days=3)).isoformat(),
+        "expired": (now - timedelta(hours=2)).isoformat(),
+    }
+
+    conn = connect()
+    conn.executescript("""
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE,
+            password_hash TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE sessions (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        );
+        CREATE INDEX idx_sessions_expires ON sessions(expires_at);
+        INSERT INTO users (id, username, password_hash) VALUES (1, 'owner', 'x');
+    """)
+    conn.executemany(
+        "INSERT INTO sessions (id, user_id, expires_at) VALUES (?, 1, ?)",
+        expiries.items(),
+    )
+    conn.commit()
+    conn.close()
+    return expiries
+
+
+def _sessions_state():
+    """Return ({session id: expires_at_ts}, index names) from the temp database."""
+    conn = connect()
+    expiries = dict(conn.execute("SELECT id, expires_at_ts FROM sessions").fetchall())
+    indexes = {
+        row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'sessions'"
+        )
+    }
+    conn.close()
+    return expiries, indexes
+
+
+class TestExpiresAtMigration:
+    def test_backfills_unix_expiry(self, legacy_sessions):
+        """Existing rows get expires_at_ts from their local-time expires_at."""
+        auth_service.ensure_auth_tables()
+        expiries, _ = _sessions_state()
+        assert expiries == {
+            session_id: int(datetime.fromisoformat(expires_at).timestamp())
+            for session_id, expires_at in legacy_sessions.items()
+        }
+
+    def test_replaces_text_expiry_index(self, legacy_sessions):
+        """The old expires_at index is dropped in favour of the integer one."""
+        auth_service.ensure_auth_tables()
+        _, indexes = _sessions_state()
+        assert "idx_sessions_expires" not in indexes
+        assert "idx_sessions_expires_ts" in indexes
+
+    def test_migrated_sessions_expire(self, legacy_sessions):
+        """Migrated sessions validate until they expire and are then cleaned up."""
+        auth_service.ensure_auth_tables()
+        assert auth_service.validate_session("live") == {"id": 1, "username": "owner"}
+        assert auth_service.validate_session("expired") is None
+
+        auth_service.cleanup_expired_sessions()
+        expiries, _ = _sessions_state()
+        assert set(expiries) == {"live"}
+
+    def test_migration_runs_once(self, legacy_sessions, monkeypatch):
+        """Running the migration again leaves the backfilled values alone."""
+        auth_service.ensure_auth_tables()
+        before, _ = _sessions_state()
+        monkeypatch.setattr(auth_service, "_auth_tables_ready", False)
+        auth_service.ensure_auth_tables()
+        after, _ = _sessions_state()
+        assert after == before
@@ -0,0 +1,78 @@
+"""tests/test_database.py
+
+Tests for the pooled database connections lent to request handlers.
+"""
+
+import sqlite3
+
+import pytest
+
+from web.database import POOLING_ENABLED, _pools, pooled_connection
+from web.dependencies import get_db, get_read_db
+
+requires_pooling = pytest.mark.skipif(
+    not POOLING_ENABLED, reason="SQLite build is not threadsafe enough for pooling"
+)
+
+
+@pytest.fixture
+def notes_table(temp_db_path):
+    """A small table in the temporary database."""
+    with pooled_connection() as conn:
+        conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)")
+        conn.commit()
+
+
+class TestPooledConnection:
+    @requires_pooling
+    def test_uncommitted_write_rolled_back_before_reuse(self, notes_table):
+        """Changes left uncommitted by one borrower are not seen by the next."""
+        with pooled_connection() as conn:
+            conn.execute("INSERT INTO notes (body) VALUES ('draft')")
+            first = conn
+
+        with pooled_connection() as conn:
+            assert conn is first
+            assert not conn.in_transaction
+            assert conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0] == 0
+
+    @requires_pooling
+    def test_connection_returned_after_exception(self, notes_table):
+        """A connection borrowed by a failing block goes back to the pool."""
+        with pytest.raises(RuntimeError):
+            with pooled_connection() as conn:
+                conn.execute("INSERT INTO notes (body) VALUES ('lost')")
+                failed = conn
+                raise RuntimeError("handler failed")
+
+        assert _pools[False].qsize() == 1
+        with pooled_connection() as conn:
+            assert conn is failed
+            assert conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0] == 0
+
+    def test_rows_are_sqlite_rows(self, notes_table):
+        """Borrowed connections return sqlite3.Row rows."""
+        with pooled_connection(read_only=True) as conn:
+            row = conn.execute("SELECT COUNT(*) AS n FROM notes").fetchone()
+        assert row["n"] == 0
+
+
+class TestDependencies:
+    def test_get_read_db_rejects_writes(self, notes_table):
+        """Writes through the read-only dependency fail instead of taking the write lock."""
+        dependency = get_read_db()
+        conn = next(dependency)
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO notes (body) VALUES ('nope')")
+        dependency.close()
+
+    def test_get_db_allows_writes(self, notes_table):
+        """The read-write dependency can write and commit."""
+        dependency = get_db()
+        conn = next(dependency)
+        conn.execute("INSERT INTO notes (body) VALUES ('kept')")
+        conn.commit()
+        dependency.close()
+
+        with pooled_connection(read_only=True) as conn:
+            assert conn.execute("SELECT body FROM notes").fetchone()[0] == "kept"
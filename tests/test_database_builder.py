@@ -0,0 +1,144 @@
+"""tests/test_database_builder.py
+
+Tests for the shared store-import and metadata-sync write helpers in database_builder.
+"""
+
+import sqlite3
+
+import pytest
+
+import web.services.database_builder
+from web.services.database_builder import (
+    _LOCAL_UPSERT_SQL, BatchedWriter, create_database, ensure_games_columns, upsert_games
+)
+
+
+@pytest.fixture
+def library_conn():
+    """In-memory connection with the full games schema."""
+    conn = sqlite3.connect(":memory:")
+    create_database(conn)
+    yield conn
+    conn.close()
+
+
+def _local_row(name, store_id):
+    """A row for _LOCAL_UPSERT_SQL."""
+    return (name, "local", store_id, None, None, None, None, None, None, "2024-01-01T00:00:00")
+
+
+class TestUpsertGames:
+    def test_writes_all_rows(self, library_conn):
+        """Valid rows go through in one call and all store IDs are returned."""
+        rows = [_local_row("A", "a"), _local_row("B", "b")]
+        written = upsert_games(library_conn.cursor(), _LOCAL_UPSERT_SQL, rows)
+        assert written == ["a", "b"]
+        assert library_conn.execute("SELECT COUNT(*) FROM games").fetchone()[0] == 2
+
+    def test_bad_row_falls_back_to_row_at_a_time(self, library_conn, capsys):
+        """A row SQLite rejects is skipped; the good rows around it are still written."""
+        rows = [_local_row("A", "a"), _local_row(None, "broken"), _local_row("C", "c")]
+        written = upsert_games(library_conn.cursor(), _LOCAL_UPSERT_SQL, rows)
+
+        assert written == ["a", "c"]
+        stored = library_conn.execute(
+            "SELECT store_id, name FROM games ORDER BY store_id"
+        ).fetchall()
+        assert stored == [("a", "A"), ("c", "C")]
+        assert "Error importing None" in capsys.readouterr().out
+
+    def test_existing_rows_are_updated(self, library_conn):
+        """Rows already in the table are updated rather than duplicated."""
+        cursor = library_conn.cursor()
+        upsert_games(cursor, _LOCAL_UPSERT_SQL, [_local_row("Old", "a")])
+        upsert_games(cursor, _LOCAL_UPSERT_SQL, [_local_row("New", "a")])
+        assert library_conn.execute("SELECT name FROM games").fetchall() == [("New",)]
+
+
+_RENAME_SQL = "UPDATE games SET name = ? WHERE store_id = ?"
+_HIDE_SQL = "UPDATE games SET hidden = 1 WHERE store_id = ?"
+
+
+class TestBatchedWriter:
+    @pytest.fixture
+    def seeded_conn(self, library_conn):
+        library_conn.execute("ALTER TABLE games ADD COLUMN hidden BOOLEAN DEFAULT 0")
+        upsert_games(
+            library_conn.cursor(), _LOCAL_UPSERT_SQL,
+            [_local_row(f"Game {i}", str(i)) for i in range(5)],
+        )
+        library_conn.commit()
+        return library_conn
+
+    @staticmethod
+    def _committed(conn):
+        """Rows visible outside the writer's connection transaction."""
+        return not conn.in_transaction
+
+    def test_rows_held_until_batch_full(self, seeded_conn):
+        """Queued rows stay unwritten until batch_size rows are queued."""
+        writer = BatchedWriter(seeded_conn, (_RENAME_SQL, _HIDE_SQL), batch_size=3)
+        writer.add(_RENAME_SQL, ("Renamed", "0"))
+        writer.add(_HIDE_SQL, ("1",))
+        assert seeded_conn.execute("SELECT name FROM games WHERE store_id = '0'").fetchone() == ("Game 0",)
+
+        writer.add(_RENAME_SQL, ("Renamed too", "2"))
+        assert self._committed(seeded_conn)
+        rows = seeded_conn.execute(
+            "SELECT store_id, name, hidden FROM games WHERE store_id IN ('0', '1', '2') ORDER BY store_id"
+        ).fetchall()
+        assert rows == [("0", "Renamed", 0), ("1", "Game 1", 1), ("2", "Renamed too", 0)]
+
+    def test_flush_writes_partial_batch(self, seeded_conn):
+        """flush() writes and commits whatever is still queued."""
+        writer = BatchedWriter(seeded_conn, (_RENAME_SQL, _HIDE_SQL))
+        writer.add(_HIDE_SQL, ("4",))
+        writer.flush()
+        assert self._committed(seeded_conn)
+        assert seeded_conn.execute("SELECT hidden FROM games WHERE store_id = '4'").fetchone() == (1,)
+
+        # Nothing queued: flushing again is harmless
+        writer.flush()
+
+
+_EXTRA_COLUMNS = [("extra_score", "REAL"), ("extra_flag", "BOOLEAN DEFAULT 0")]
+_EXTRA_INDEX = "CREATE INDEX IF NOT EXISTS idx_games_extra ON games(extra_score)"
+
+
+def _games_columns(conn):
+    return {row[1] for row in conn.execute("PRAGMA table_info(games)")}
+
+
+class TestEnsureGamesColumns:
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self, monkeypatch):
+        monkeypatch.setattr(web.services.database_builder, "_ensured_games_columns", set())
+
+    def test_adds_missing_columns_and_indexes(self, library_conn):
+        """Missing columns and the given indexes are created and committed."""
+        library_conn.execute("ALTER TABLE games ADD COLUMN extra_score REAL")
+        library_conn.commit()
+
+        ensure_games_columns(library_conn, _EXTRA_COLUMNS, indexes=(_EXTRA_INDEX,))
+
+        assert {"extra_score", "extra_flag"} <= _games_columns(library_conn)
+        assert not library_conn.in_transaction
+        indexes = {row[1] for row in library_conn.execute("PRAGMA index_list(games)")}
+        assert "idx_games_extra" in indexes
+
+    def test_checked_once_per_process(self):
+        """A column list already ensured is not probed again."""
+        first = sqlite3.connect(":memory:")
+        create_database(first)
+        ensure_games_columns(first, _EXTRA_COLUMNS)
+        assert "extra_flag" in _games_columns(first)
+
+        # Same list on a schema without the columns: the cached check wins
+        second = sqlite3.connect(":memory:")
+        create_database(second)
+        ensure_games_columns(second, _EXTRA_COLUMNS)
+        assert "extra_flag" not in _games_columns(second)
+
+        # A different list is still checked
+        ensure_games_columns(second, _EXTRA_COLUMNS[:1])
+        assert "extra_score" in _games_columns(second)
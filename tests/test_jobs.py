@@ -0,0 +1,88 @@
+"""tests/test_jobs.py
+
+Tests for background job progress tracking.
+"""
+
+import pytest
+
+from web.database import connect
+from web.services import jobs
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for the progress coalescing."""
+    now = [1000.0]
+    monkeypatch.setattr(jobs.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def job_id(temp_db_path, clock):
+    """A freshly created store sync job in the temporary database."""
+    jobs.ensure_jobs_table()
+    job_id = jobs.create_job(jobs.JobType.STORE_SYNC, "Starting...")
+    yield job_id
+    jobs._forget_progress(job_id)
+
+
+def _stored_progress(job_id):
+    """Read (progress, total, status) straight from the table, bypassing get_job."""
+    conn = connect()
+    row = conn.execute(
+        "SELECT progress, total, status FROM jobs WHERE id = ?", (job_id,)
+    ).fetchone()
+    conn.close()
+    return row
+
+
+class TestProgressCoalescing:
+    def test_updates_within_interval_are_coalesced(self, job_id, clock):
+        """Only the first of several quick updates is written."""
+        jobs.update_job_progress(job_id, 1, 10)
+        clock[0] += jobs.PROGRESS_UPDATE_INTERVAL / 4
+        jobs.update_job_progress(job_id, 2, 10)
+        jobs.update_job_progress(job_id, 3, 10)
+        assert _stored_progress(job_id) == (1, 10, "running")
+
+    def test_update_after_interval_is_written(self, job_id, clock):
+        """An update reported after the interval is written straight away."""
+        jobs.update_job_progress(job_id, 1, 10)
+        clock[0] += jobs.PROGRESS_UPDATE_INTERVAL
+        jobs.update_job_progress(job_id, 5, 10)
+        assert _stored_progress(job_id) == (5, 10, "running")
+
+    def test_final_and_forced_updates_always_written(self, job_id, clock):
+        """progress == total and forced updates skip the coalescing."""
+        jobs.update_job_progress(job_id, 1, 10)
+        jobs.update_job_progress(job_id, 4, 10, force=True)
+        assert _stored_progress(job_id) == (4, 10, "running")
+        jobs.update_job_progress(job_id, 10, 10)
+        assert _stored_progress(job_id) == (10, 10, "running")
+
+    def test_pending_update_written_on_poll_once_due(self, job_id, clock):
+        """A coalesced update is flushed by the UI's next poll after the interval."""
+        jobs.update_job_progress(job_id, 1, 10)
+        jobs.update_job_progress(job_id, 7, 10)
+
+        assert jobs.get_job(job_id)["progress"] == 1
+        clock[0] += jobs.PROGRESS_UPDATE_INTERVAL
+        assert jobs.get_job(job_id)["progress"] == 7
+        assert jobs.get_active_jobs()[0]["progress"] == 7
+
+    def test_fail_job_keeps_pending_progress(self, job_id, clock):
+        """A failing job records how far it got, including a coalesced update."""
+        jobs.update_job_progress(job_id, 1, 10)
+        jobs.update_job_progress(job_id, 6, 10)
+        jobs.fail_job(job_id, "boom")
+        assert _stored_progress(job_id) == (6, 10, "failed")
+
+    def test_completed_job_not_reopened_by_poll(self, job_id, clock):
+        """Completing a job drops its pending update, so polls can't mark it running."""
+        jobs.update_job_progress(job_id, 1, 10)
+        jobs.update_job_progress(job_id, 6, 10)
+        jobs.complete_job(job_id, {"steam": 6}, "Done")
+        clock[0] += jobs.PROGRESS_UPDATE_INTERVAL
+        job = jobs.get_job(job_id)
+        assert job["status"] == "completed"
+        assert job["progress"] == 10
@@ -0,0 +1,117 @@
+"""tests/test_settings.py
+
+Tests for database-backed settings, their in-process cache and the settings form.
+
+Covered endpoints:
+  POST /settings
+"""
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from web.database import connect
+from web.services.settings import (
+    GOG_DB_PATH, IGDB_MATCH_THRESHOLD, LOCAL_GAMES_PATHS, SETTINGS_CACHE_TTL, STEAM_ID,
+    delete_setting, get_setting, get_settings_bulk, set_setting, set_settings
+)
+
+
+@pytest.fixture
+def settings_client(temp_db_path, monkeypatch):
+    """TestClient backed by a temporary database, without env overrides."""
+    from web.main import app
+
+    monkeypatch.delenv("IGDB_MATCH_THRESHOLD", raising=False)
+    return TestClient(app)
+
+
+class TestSaveSettings:
+    def test_saves_threshold(self, settings_client):
+        """A submitted threshold is stored and read back."""
+        resp = settings_client.post(
+            "/settings", data={"igdb_match_threshold": " 70 "}, follow_redirects=False
+        )
+        assert resp.status_code == 303
+        assert get_setting(IGDB_MATCH_THRESHOLD) == "70"
+
+    def test_empty_threshold_saves_default(self, settings_client):
+        """Clearing the threshold field stores the default instead of ''."""
+        settings_client.post("/settings", data={"igdb_match_threshold": "70"}, follow_redirects=False)
+        settings_client.post("/settings", data={"igdb_match_threshold": ""}, follow_redirects=False)
+        assert get_setting(IGDB_MATCH_THRESHOLD) == "50"
+        assert int(get_setting(IGDB_MATCH_THRESHOLD, "50")) == 50
+
+    def test_missing_threshold_saves_default(self, settings_client):
+        """A form without the threshold field stores the default."""
+        settings_client.post("/settings", data={"steam_id": "123"}, follow_redirects=False)
+        assert get_setting(IGDB_MATCH_THRESHOLD) == "50"
+
+
+# --------------------------------------------------------------------------- #
+# Settings cache                                                               #
+# --------------------------------------------------------------------------- #
+
+
+class TestSettingsCache:
+    @pytest.fixture(autouse=True)
+    def _no_env_overrides(self, monkeypatch):
+        """Keep environment variables from masking database values."""
+        for env_var in ("GOG_DB_PATH", "LOCAL_GAMES_PATHS", "STEAM_ID"):
+            monkeypatch.delenv(env_var, raising=False)
+
+    def test_set_setting_refreshes_cached_value(self, temp_db_path):
+        """A cached read is replaced by the value written through set_setting."""
+        set_setting(GOG_DB_PATH, "/first")
+        assert get_setting(GOG_DB_PATH) == "/first"
+        set_setting(GOG_DB_PATH, "/second")
+        assert get_setting(GOG_DB_PATH) == "/second"
+
+    def test_set_settings_refreshes_cached_values(self, temp_db_path):
+        """set_settings writes through to the cache for every key."""
+        set_settings({GOG_DB_PATH: "/first", LOCAL_GAMES_PATHS: "/games"})
+        assert get_setting(GOG_DB_PATH) == "/first"
+        set_settings({GOG_DB_PATH: "/second"})
+        assert get_settings_bulk([GOG_DB_PATH, LOCAL_GAMES_PATHS]) == {
+            GOG_DB_PATH: "/second",
+            LOCAL_GAMES_PATHS: "/games",
+        }
+
+    def test_delete_setting_invalidates_cache(self, temp_db_path):
+        """A deleted setting is no longer served from the cache."""
+        set_setting(GOG_DB_PATH, "/gone")
+        assert get_setting(GOG_DB_PATH) == "/gone"
+        delete_setting(GOG_DB_PATH)
+        assert get_setting(GOG_DB_PATH, "default") == "default"
+
+    def test_cache_expires_after_ttl(self, temp_db_path, monkeypatch):
+        """Values written by another process show up once the TTL has passed."""
+        set_setting(GOG_DB_PATH, "/cached")
+        assert get_setting(GOG_DB_PATH) == "/cached"
+
+        conn = connect()
+        conn.execute("UPDATE settings SET value = '/external' WHERE key = ?", (GOG_DB_PATH,))
+        conn.commit()
+        conn.close()
+        assert get_setting(GOG_DB_PATH) == "/cached"
+
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now + SETTINGS_CACHE_TTL + 1)
+        assert get_setting(GOG_DB_PATH) == "/external"
+
+    def test_env_var_takes_precedence(self, temp_db_path, monkeypatch):
+        """Environment variables win over database and cached values."""
+        set_setting(STEAM_ID, "from-db")
+        assert get_setting(STEAM_ID) == "from-db"
+        monkeypatch.setenv("STEAM_ID", "from-env")
+        assert get_setting(STEAM_ID) == "from-env"
+        assert get_settings_bulk([STEAM_ID]) == {STEAM_ID: "from-env"}
+
+    def test_bulk_omits_keys_without_value(self, temp_db_path):
+        """get_settings_bulk leaves out keys that are unset, cached or not."""
+        set_setting(GOG_DB_PATH, "/gog")
+        keys = [GOG_DB_PATH, STEAM_ID]
+        assert get_settings_bulk(keys) == {GOG_DB_PATH: "/gog"}
+        # Second call is served from the cache, including the missing key
+        assert get_settings_bulk(keys) == {GOG_DB_PATH: "/gog"}
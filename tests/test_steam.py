@@ -0,0 +1,107 @@
+"""tests/test_steam.py
+
+Tests for the Steam review-score cache used during Steam imports.
+"""
+
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from web.database import connect
+from web.sources import steam
+
+OWNED_GAMES = [
+    {"appid": 10, "name": "Counter-Strike", "playtime_forever": 60, "img_icon_url": "cs"},
+    {"appid": 20, "name": "Team Fortress Classic", "playtime_forever": 0, "img_icon_url": "tfc"},
+]
+
+
+def _reviews(score):
+    return {"review_score": score, "review_desc": "Positive", "total_reviews": 100}
+
+
+@pytest.fixture
+def steam_api(temp_db_path, monkeypatch):
+    """Stub the Steam Web API; returns the appids looked up on the review endpoint."""
+    lookups = []
+
+    def fake_review_score(appid):
+        lookups.append(appid)
+        return _reviews(90.0)
+
+    owned = SimpleNamespace(content=orjson.dumps({"response": {"games": OWNED_GAMES}}))
+    monkeypatch.setattr(steam, "get_steam_credentials", lambda: {"api_key": "k", "steam_id": "1"})
+    monkeypatch.setattr(steam, "_session", SimpleNamespace(get=lambda url, params=None: owned))
+    monkeypatch.setattr(steam, "get_steam_review_score", fake_review_score)
+    return lookups
+
+
+def _age_cache_entry(appid, days):
+    """Move a cache entry's fetched_at into the past."""
+    conn = connect()
+    conn.execute(
+        "UPDATE steam_review_cache SET fetched_at = datetime('now', ?) WHERE appid = ?",
+        (f"-{days} days", appid),
+    )
+    conn.commit()
+    conn.close()
+
+
+class TestReviewCache:
+    def test_saved_reviews_round_trip(self, temp_db_path):
+        """Stored review summaries load back unchanged."""
+        steam._save_review_cache({10: _reviews(75.5)})
+        assert steam._load_review_cache() == {10: _reviews(75.5)}
+
+    def test_expired_entries_not_loaded(self, temp_db_path):
+        """Entries older than REVIEW_CACHE_TTL_DAYS are ignored."""
+        steam._save_review_cache({10: _reviews(75.5), 20: _reviews(60.0)})
+        _age_cache_entry(10, steam.REVIEW_CACHE_TTL_DAYS + 1)
+        assert steam._load_review_cache() == {20: _reviews(60.0)}
+
+
+class TestLibraryReviewCache:
+    def test_first_import_fetches_and_caches(self, steam_api):
+        """A cold cache fetches every game and stores the results."""
+        games = steam.get_steam_library()
+        assert sorted(steam_api) == [10, 20]
+        assert {g["appid"]: g["review_score"] for g in games} == {10: 90.0, 20: 90.0}
+        assert set(steam._load_review_cache()) == {10, 20}
+
+    def test_cache_hit_skips_lookup(self, steam_api):
+        """Games with a fresh cache entry use it instead of calling the Store."""
+        steam._save_review_cache({10: _reviews(42.0)})
+        games = steam.get_steam_library()
+        assert steam_api == [20]
+        assert {g["appid"]: g["review_score"] for g in games} == {10: 42.0, 20: 90.0}
+
+    def test_expired_entry_refetched(self, steam_api):
+        """An entry past the TTL is looked up again and refreshed."""
+        steam._save_review_cache({10: _reviews(42.0), 20: _reviews(42.0)})
+        _age_cache_entry(10, steam.REVIEW_CACHE_TTL_DAYS + 1)
+        games = steam.get_steam_library()
+        assert steam_api == [10]
+        assert {g["appid"]: g["review_score"] for g in games} == {10: 90.0, 20: 42.0}
+        assert steam._load_review_cache()[10] == _reviews(90.0)
+
+    def test_ignore_cache_refetches_everything(self, steam_api):
+        """ignore_cache looks up every game and refreshes the cache."""
+        steam._save_review_cache({10: _reviews(42.0), 20: _reviews(42.0)})
+        games = steam.get_steam_library(ignore_cache=True)
+        assert sorted(steam_api) == [10, 20]
+        assert all(g["review_score"] == 90.0 for g in games)
+        assert steam._load_review_cache()[10] == _reviews(90.0)
+
+    def test_forced_import_bypasses_cache(self, steam_api):
+        """import_steam_games(force=True) passes the bypass through to the library fetch."""
+        from web.services.database_builder import create_database, import_steam_games
+
+        steam._save_review_cache({10: _reviews(42.0), 20: _reviews(42.0)})
+        conn = connect()
+        create_database(conn)
+        assert import_steam_games(conn) == 2
+        assert steam_api == []
+        assert import_steam_games(conn, force=True) == 2
+        assert sorted(steam_api) == [10, 20]
+        conn.close()
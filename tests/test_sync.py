@@ -0,0 +1,120 @@
+"""tests/test_sync.py
+
+Tests for the store sync and bookmarklet import endpoints.
+
+Covered endpoints:
+  POST /api/sync/store/{store}
+  POST /api/import/ubisoft
+  POST /api/import/gog
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from web.routes import sync
+from web.services.jobs import ensure_jobs_table, get_job
+
+
+@pytest.fixture
+def sync_client(temp_db_path, monkeypatch):
+    """TestClient whose store sync jobs run inline with stubbed importers."""
+    from web.main import app
+
+    ensure_jobs_table()
+    stub_plans = {
+        store: [(name, lambda conn: 0) for name, _ in plan]
+        for store, plan in sync._STORE_SYNC_PLANS.items()
+    }
+    monkeypatch.setattr(sync, "_STORE_SYNC_PLANS", stub_plans)
+    monkeypatch.setattr(sync, "_STORE_FORCE_IMPORTERS", {})
+    monkeypatch.setattr(sync, "_configured_stores", lambda plan, conn=None: plan)
+    monkeypatch.setattr(sync, "run_job_async", lambda job_id, job_func: job_func(job_id))
+    return TestClient(app)
+
+
+class TestSyncStore:
+    @pytest.mark.parametrize("store", list(sync.StoreType))
+    def test_every_store_type_completes(self, sync_client, store):
+        """Every StoreType value starts a job that completes, even without an importer."""
+        resp = sync_client.post(f"/api/sync/store/{store.value}")
+        assert resp.status_code == 200
+        job = get_job(resp.json()["job_id"])
+        assert job["status"] == "completed", job["error"]
+
+    def test_store_without_importer_syncs_nothing(self, sync_client):
+        """Ubisoft is imported through the bookmarklet, so a store sync reports zero games."""
+        resp = sync_client.post("/api/sync/store/ubisoft")
+        job = get_job(resp.json()["job_id"])
+        assert job["message"] == "Synced 0 games from Ubisoft"
+
+
+# --------------------------------------------------------------------------- #
+# POST /api/import/ubisoft, POST /api/import/gog                               #
+# --------------------------------------------------------------------------- #
+
+
+@pytest.fixture
+def import_client(temp_db_path):
+    """TestClient writing bookmarklet imports to a temporary database."""
+    from web.main import app
+
+    return TestClient(app)
+
+
+def _stored_games(store):
+    """Return {store_id: row} for the games of one store in the temp database."""
+    from web.database import pooled_connection
+
+    with pooled_connection(read_only=True) as conn:
+        rows = conn.execute(
+            "SELECT store_id, name, playtime_hours, extra_data FROM games WHERE store = ?",
+            (store,),
+        ).fetchall()
+    return {row["store_id"]: row for row in rows}
+
+
+class TestBookmarkletImport:
+    def test_import_spans_several_batches(self, import_client):
+        """More rows than one multi-row INSERT holds are all written."""
+        count = sync._IMPORT_BATCH_SIZE * 2 + 5
+        games = [{"id": str(i), "title": f"Game {i}"} for i in range(count)]
+        resp = import_client.post("/api/import/gog", json={"games": games})
+        assert resp.json()["count"] == count
+        assert len(_stored_games("gog")) == count
+
+    def test_duplicate_store_ids_in_one_batch(self, import_client):
+        """A repeated store_id inside one batch keeps the last row's values."""
+        games = [
+            {"id": "42", "title": "First Title"},
+            {"id": "7", "title": "Other"},
+            {"id": "42", "title": "Second Title"},
+        ]
+        resp = import_client.post("/api/import/gog", json={"games": games})
+        assert resp.status_code == 200
+        stored = _stored_games("gog")
+        assert set(stored) == {"42", "7"}
+        assert stored["42"]["name"] == "Second Title"
+
+    def test_ubisoft_store_id_translation(self, import_client):
+        """Ubisoft store IDs are the lowercased title with dashes, minus ':' and "'"."""
+        games = [{"title": "Assassin's Creed: Origins", "playtime": "2 hours 30 minutes"}]
+        import_client.post("/api/import/ubisoft", json={"games": games})
+        stored = _stored_games("ubisoft")
+        assert list(stored) == ["assassins-creed-origins"]
+        assert stored["assassins-creed-origins"]["playtime_hours"] == 2.5
+
+    def test_extra_data_null_when_all_fields_missing(self, import_client):
+        """extra_data is NULL when none of its fields are set, JSON otherwise."""
+        games = [
+            {"id": "1", "title": "Bare"},
+            {"id": "2", "title": "Linked", "storeUrl": "https://www.gog.com/game/linked"},
+        ]
+        import_client.post("/api/import/gog", json={"games": games})
+        stored = _stored_games("gog")
+        assert stored["1"]["extra_data"] is None
+        assert json.loads(stored["2"]["extra_data"]) == {
+            "profile_url": None,
+            "store_url": "https://www.gog.com/game/linked",
+        }
@@ -7,6 +7,9 @@ from pathlib import Path
 # Database path - can be overridden by environment variable
 DATABASE_PATH = Path(os.environ.get("DATABASE_PATH", Path(__file__).parent.parent / "data" / "game_library.db"))
 
+# Development mode (template auto-reload, uvicorn --reload)
+DEBUG = os.environ.get("DEBUG", "true").lower() == "true"
+
 # Authentication (optional) - disabled by default
 ENABLE_AUTH = os.environ.get("ENABLE_AUTH", "false").lower() == "true"
 SECRET_KEY = os.environ.get("SECRET_KEY", "")
@@ -1,20 +1,89 @@
 # database.py
 # Database connection and migration functions
 
+import queue
 import sqlite3
+from contextlib import contextmanager
+
 from .config import DATABASE_PATH
 
+# Per-connection tuning. journal_mode=WAL is persistent in the database file,
+# so it is switched on once at startup by enable_wal() instead of here.
+CONNECTION_PRAGMAS = """
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-65536;
+    PRAGMA mmap_size=268435456;
+"""
 
-def get_db():
-    """Get database connection."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
+
+def configure_connection(conn, read_only=False):
+    """Apply performance PRAGMAs to a freshly opened connection."""
+    conn.executescript(CONNECTION_PRAGMAS)
+    if read_only:
+        conn.execute("PRAGMA query_only=1")
     return conn
 
 
+def connect(read_only=False, **kwargs):
+    """Open a tuned connection to the main database."""
+    conn = sqlite3.connect(DATABASE_PATH, **kwargs)
+    return configure_connection(conn, read_only=read_only)
+
+
+# Process-wide pools of idle connections, keyed by read_only. SQLite allows a
+# single writer at a time, so only one idle write connection is kept around.
+READ_POOL_SIZE = 4
+WRITE_POOL_SIZE = 1
+_pools = {
+    True: queue.LifoQueue(maxsize=READ_POOL_SIZE),
+    False: queue.LifoQueue(maxsize=WRITE_POOL_SIZE),
+}
+# Pooled connections are handed from one request thread to another, which is
+# only safe when the SQLite library is built in serialized mode.
+POOLING_ENABLED = sqlite3.threadsafety >= 2
+
+
+def _release_connection(conn, read_only):
+    """Return a borrowed connection to its pool, or close it if it can't be reused."""
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+        if POOLING_ENABLED:
+            _pools[read_only].put_nowait(conn)
+            return
+    except (sqlite3.Error, queue.Full):
+        pass
+    conn.close()
+
+
+@contextmanager
+def pooled_connection(read_only=False):
+    """Borrow a tuned connection (with sqlite3.Row rows) from the process-wide pool.
+
+    Uncommitted changes are rolled back when the connection is returned.
+    """
+    try:
+        conn = _pools[read_only].get_nowait()
+    except queue.Empty:
+        conn = connect(read_only=read_only, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+    finally:
+        _release_connection(conn, read_only)
+
+
+def enable_wal():
+    """Switch the database to write-ahead logging so readers never block on writers."""
+    conn = connect()
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.close()
+
+
 def ensure_extra_columns():
     """Add extra columns to database if they don't exist."""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = connect()
     cursor = conn.cursor()
     # Check if games table exists first
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='games'")
@@ -31,13 +100,15 @@ def ensure_extra_columns():
         cursor.execute("ALTER TABLE games ADD COLUMN cover_url_override TEXT")
     if "removed" not in columns:
         cursor.execute("ALTER TABLE games ADD COLUMN removed BOOLEAN DEFAULT 0")
+    # Partial index: hidden games are few, and the hidden count/list only look at those
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_hidden ON games(hidden) WHERE hidden = 1")
     conn.commit()
     conn.close()
 
 
 def ensure_edit_overrides():
     """Add genres_override and playtime_label columns to the games table."""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = connect()
     cursor = conn.cursor()
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='games'")
     if not cursor.fetchone():
@@ -55,7 +126,7 @@ def ensure_edit_overrides():
 
 def ensure_collections_tables():
     """Create collections tables if they don't exist."""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = connect()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -4,12 +4,12 @@
 import sqlite3
 from typing import Generator
 
-from .config import DATABASE_PATH
+from .database import pooled_connection
 
 
 def get_db() -> Generator[sqlite3.Connection, None, None]:
     """
-    Database dependency that provides a connection and ensures cleanup.
+    Database dependency that lends a pooled connection and returns it afterwards.
 
     Usage:
         @router.get("/endpoint")
@@ -17,9 +17,17 @@ def get_db() -> Generator[sqlite3.Connection, None, None]:
             cursor = conn.cursor()
             # ... use cursor ...
     """
-    conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    try:
+    with pooled_connection() as conn:
+        yield conn
+
+
+def get_read_db() -> Generator[sqlite3.Connection, None, None]:
+    """
+    Read-only variant of get_db for routes that never write.
+
+    Connections are borrowed from a process-wide pool so SQLite's page cache
+    survives between requests. They are opened with PRAGMA query_only so an
+    accidental write fails loudly instead of taking the database write lock.
+    """
+    with pooled_connection(read_only=True) as conn:
         yield conn
-    finally:
-        conn.close()
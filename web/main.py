@@ -1,20 +1,19 @@
 # main.py
 # FastAPI application entry point for Backlogia
 
-import sqlite3
 from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 
-from .config import DATABASE_PATH, ENABLE_AUTH, SECRET_KEY
-from .database import ensure_extra_columns, ensure_collections_tables, ensure_edit_overrides
+from .config import ENABLE_AUTH, SECRET_KEY
+from .database import connect, enable_wal, ensure_extra_columns, ensure_collections_tables, ensure_edit_overrides
+from .services.auth_service import ensure_auth_tables
 from .services.database_builder import create_database
 from .services.igdb_sync import add_igdb_columns
-from .services.jobs import cleanup_orphaned_jobs
+from .services.jobs import ensure_jobs_table, cleanup_orphaned_jobs
 
 # Import routers
 from .routes.api_games import router as api_games_router
@@ -32,11 +31,14 @@ from .routes.jobs import router as jobs_router
 def init_database():
     """Initialize the database and ensure all tables/columns exist."""
     create_database()
+    enable_wal()
     ensure_extra_columns()
     ensure_collections_tables()
     ensure_edit_overrides()
+    ensure_auth_tables()
+    ensure_jobs_table()
 
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = connect()
     add_igdb_columns(conn)
     conn.close()
 
@@ -93,9 +95,6 @@ static_path = Path(__file__).parent / "static"
 if static_path.exists():
     app.mount("/static", StaticFiles(directory=static_path), name="static")
 
-# Configure templates (shared instance for all routers)
-templates = Jinja2Templates(directory=Path(__file__).parent / "templates")
-
 # Include routers
 app.include_router(library_router)
 app.include_router(api_games_router)
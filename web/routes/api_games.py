@@ -6,14 +6,14 @@ import sqlite3
 
 from fastapi import APIRouter, Depends
 
-from ..dependencies import get_db
+from ..dependencies import get_read_db
 from ..utils.filters import EXCLUDE_DUPLICATES_FILTER, EXCLUDE_HIDDEN_FILTER
 
 router = APIRouter(tags=["Games"])
 
 
 @router.get("/api/games")
-def api_games(conn: sqlite3.Connection = Depends(get_db)):
+def api_games(conn: sqlite3.Connection = Depends(get_read_db)):
     """Get all games in the library."""
     cursor = conn.cursor()
 
@@ -24,7 +24,7 @@ def api_games(conn: sqlite3.Connection = Depends(get_db)):
 
 
 @router.get("/api/stats")
-def api_stats(conn: sqlite3.Connection = Depends(get_db)):
+def api_stats(conn: sqlite3.Connection = Depends(get_read_db)):
     """Get library statistics."""
     cursor = conn.cursor()
 
@@ -45,7 +45,7 @@ def api_stats(conn: sqlite3.Connection = Depends(get_db)):
 
 
 @router.get("/api/genres")
-def api_genres(conn: sqlite3.Connection = Depends(get_db)):
+def api_genres(conn: sqlite3.Connection = Depends(get_read_db)):
     """Get all distinct genres present in the library.
 
     Merges genres from the store-provided ``genres`` column and from the
@@ -9,6 +9,12 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
 from ..dependencies import get_db
+from ..services.database_builder import (
+    add_average_rating_column, calculate_average_rating, update_average_rating
+)
+from ..services.igdb_sync import IGDBClient, extract_genres_and_themes, merge_and_dedupe_genres
+from ..services.metacritic_sync import MetacriticClient, add_metacritic_columns
+from ..services.protondb_sync import ProtonDBClient, add_protondb_columns
 from ..utils.filters import PLAYTIME_LABELS
 
 router = APIRouter(tags=["Metadata"])
@@ -70,12 +76,6 @@ class BulkEditRequest(BaseModel):
 @router.post("/api/game/{game_id}/igdb")
 def update_igdb(game_id: int, body: UpdateIgdbRequest, conn: sqlite3.Connection = Depends(get_db)):
     """Update IGDB ID for a game."""
-    # Import here to avoid circular imports
-    from ..services.igdb_sync import (
-        IGDBClient, extract_genres_and_themes, merge_and_dedupe_genres
-    )
-    from ..services.database_builder import update_average_rating
-
     igdb_id = body.igdb_id
 
     # Allow clearing the IGDB ID
@@ -98,7 +98,6 @@ def update_igdb(game_id: int, body: UpdateIgdbRequest, conn: sqlite3.Connection
             WHERE id = ?""",
             (game_id,),
         )
-        conn.commit()
         update_average_rating(conn, game_id)
         return {"success": True, "message": "IGDB data cleared"}
 
@@ -182,7 +181,6 @@ def update_igdb(game_id: int, body: UpdateIgdbRequest, conn: sqlite3.Connection
                 game_id,
             ),
         )
-        conn.commit()
         update_average_rating(conn, game_id)
 
         return {
@@ -253,10 +251,6 @@ def update_cover_override(game_id: int, body: UpdateCoverOverrideRequest, conn:
 @router.post("/api/game/{game_id}/metacritic")
 def update_metacritic(game_id: int, body: UpdateMetacriticRequest, conn: sqlite3.Connection = Depends(get_db)):
     """Set custom Metacritic slug and fetch data."""
-    # Import here to avoid circular imports
-    from ..services.metacritic_sync import MetacriticClient, add_metacritic_columns
-    from ..services.database_builder import update_average_rating
-
     # Ensure columns exist
     add_metacritic_columns(conn)
 
@@ -275,7 +269,6 @@ def update_metacritic(game_id: int, body: UpdateMetacriticRequest, conn: sqlite3
             WHERE id = ?""",
             (game_id,),
         )
-        conn.commit()
         update_average_rating(conn, game_id)
         return {"success": True, "message": "Metacritic data cleared"}
 
@@ -305,7 +298,6 @@ def update_metacritic(game_id: int, body: UpdateMetacriticRequest, conn: sqlite3
                 game_id,
             ),
         )
-        conn.commit()
         update_average_rating(conn, game_id)
 
         score_info = []
@@ -336,8 +328,6 @@ def update_metacritic(game_id: int, body: UpdateMetacriticRequest, conn: sqlite3
 @router.post("/api/game/{game_id}/protondb")
 def update_protondb(game_id: int, body: UpdateProtonDBRequest, conn: sqlite3.Connection = Depends(get_db)):
     """Set custom Steam ID and fetch ProtonDB data."""
-    from ..services.protondb_sync import ProtonDBClient, add_protondb_columns
-
     # Ensure columns exist
     add_protondb_columns(conn)
 
@@ -409,10 +399,6 @@ def update_protondb(game_id: int, body: UpdateProtonDBRequest, conn: sqlite3.Con
 @router.post("/api/games/recalculate-average-ratings")
 def recalculate_average_ratings(conn: sqlite3.Connection = Depends(get_db)):
     """Recalculate average ratings for all games with at least one rating."""
-    from ..services.database_builder import (
-        add_average_rating_column, calculate_average_rating
-    )
-
     # Ensure the column exists
     add_average_rating_column(conn)
 
@@ -432,9 +418,8 @@ def recalculate_average_ratings(conn: sqlite3.Connection = Depends(get_db)):
     )
     rows = cursor.fetchall()
 
-    updated = 0
+    updates = []
     for row in rows:
-        game_id = row[0]
         avg = calculate_average_rating(
             critics_score=row[1],
             igdb_rating=row[2],
@@ -444,13 +429,11 @@ def recalculate_average_ratings(conn: sqlite3.Connection = Depends(get_db)):
             metacritic_user_score=row[6],
         )
         if avg is not None:
-            cursor.execute(
-                "UPDATE games SET average_rating = ? WHERE id = ?",
-                (avg, game_id),
-            )
-            updated += 1
+            updates.append((avg, row[0]))
 
+    cursor.executemany("UPDATE games SET average_rating = ? WHERE id = ?", updates)
     conn.commit()
+    updated = len(updates)
     return {"success": True, "updated": updated, "message": f"Recalculated average ratings for {updated} games"}
 
 
@@ -553,14 +536,13 @@ def bulk_add_to_collection(body: BulkAddToCollectionRequest, conn: sqlite3.Conne
     if not cursor.fetchone():
         raise HTTPException(status_code=404, detail="Collection not found")
 
-    # Add games to collection (ignore duplicates)
-    added = 0
-    for game_id in game_ids:
-        cursor.execute(
-            "INSERT OR IGNORE INTO collection_games (collection_id, game_id) VALUES (?, ?)",
-            (collection_id, game_id)
-        )
-        added += cursor.rowcount
+    # Add games to collection (ignore duplicates); rowcount sums the rows
+    # actually inserted across the batch
+    cursor.executemany(
+        "INSERT OR IGNORE INTO collection_games (collection_id, game_id) VALUES (?, ?)",
+        [(collection_id, game_id) for game_id in game_ids]
+    )
+    added = cursor.rowcount
 
     # Update collection's updated_at
     cursor.execute(
@@ -1,11 +1,8 @@
 # routes/app_auth.py
 # Login, setup, and logout routes for optional authentication
 
-from pathlib import Path
-
 from fastapi import APIRouter, Form, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from itsdangerous import URLSafeSerializer
 
 from ..config import ENABLE_AUTH, SECRET_KEY
@@ -17,9 +14,9 @@ from ..services.auth_service import (
     delete_session,
     get_or_create_secret_key,
 )
+from ..templating import templates
 
 router = APIRouter(tags=["App Auth"])
-templates = Jinja2Templates(directory=Path(__file__).parent.parent / "templates")
 
 
 def _get_signer():
@@ -2,17 +2,45 @@
 # Epic and Amazon authentication routes
 
 import subprocess
+import time
+import uuid
 from typing import Optional
 from urllib.parse import urlparse, parse_qs
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
-router = APIRouter(tags=["Authentication"])
+from ..sources.amazon import (
+    is_nile_installed, start_auth, complete_auth, logout, check_auth_status
+)
+from ..sources.epic import is_legendary_installed, check_authentication
+
+router = APIRouter(tags=["Authentication"], default_response_class=ORJSONResponse)
 
 # Session storage for Amazon auth flow
 _amazon_auth_sessions = {}
 
+# Status checks shell out to Legendary/Nile, which takes seconds; keep the
+# last answer briefly so page loads and repeated polls don't re-run them.
+# Maps "epic"/"amazon" -> (checked_at, status payload).
+STATUS_CACHE_TTL = 5  # seconds
+_status_cache = {}
+
+
+def _get_cached_status(name):
+    """Return a recent status payload for the given store, or None."""
+    cached = _status_cache.get(name)
+    if cached and time.monotonic() - cached[0] < STATUS_CACHE_TTL:
+        return cached[1]
+    return None
+
+
+def _cache_status(name, status):
+    """Remember a freshly computed status payload and return it."""
+    _status_cache[name] = (time.monotonic(), status)
+    return status
+
 
 class EpicAuthRequest(BaseModel):
     code: str
@@ -26,47 +54,49 @@ class AmazonAuthCompleteRequest(BaseModel):
 @router.get("/api/epic/status")
 def epic_auth_status():
     """Check Epic Games authentication status via Legendary."""
-    # Import here to avoid circular imports
-    from ..sources.epic import is_legendary_installed, check_authentication
+    cached = _get_cached_status("epic")
+    if cached is not None:
+        return cached
 
     try:
-        if not is_legendary_installed():
-            return {
-                "success": True,
-                "installed": False,
-                "authenticated": False,
-                "message": "Legendary CLI is not installed"
-            }
+        return _cache_status("epic", _check_epic_status())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        is_auth, username, error = check_authentication()
 
-        if error == "corrective_action":
-            return {
-                "success": True,
-                "installed": True,
-                "authenticated": False,
-                "needs_reauth": True,
-                "message": "Epic requires you to accept updated terms. Please re-authenticate."
-            }
+def _check_epic_status():
+    """Build the Epic status payload by querying Legendary."""
+    if not is_legendary_installed():
+        return {
+            "success": True,
+            "installed": False,
+            "authenticated": False,
+            "message": "Legendary CLI is not installed"
+        }
+
+    is_auth, username, error = check_authentication()
 
+    if error == "corrective_action":
         return {
             "success": True,
             "installed": True,
-            "authenticated": is_auth,
-            "username": username,
-            "message": f"Logged in as {username}" if is_auth else "Not authenticated"
+            "authenticated": False,
+            "needs_reauth": True,
+            "message": "Epic requires you to accept updated terms. Please re-authenticate."
         }
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "success": True,
+        "installed": True,
+        "authenticated": is_auth,
+        "username": username,
+        "message": f"Logged in as {username}" if is_auth else "Not authenticated"
+    }
 
 
 @router.post("/api/epic/auth")
 def epic_authenticate(body: EpicAuthRequest):
     """Authenticate with Epic Games using an authorization code."""
-    # Import here to avoid circular imports
-    from ..sources.epic import is_legendary_installed, check_authentication
-
     try:
         if not is_legendary_installed():
             raise HTTPException(
@@ -86,6 +116,7 @@ def epic_authenticate(body: EpicAuthRequest):
             text=True,
             timeout=30
         )
+        _status_cache.pop("epic", None)
 
         if result.returncode == 0:
             # Verify authentication succeeded
@@ -117,13 +148,11 @@ def epic_authenticate(body: EpicAuthRequest):
 def amazon_auth_start():
     """Start Amazon OAuth flow via Nile - returns login URL."""
     try:
-        from ..sources.amazon import is_nile_installed, start_auth, logout, check_auth_status
-        import uuid
-
         if not is_nile_installed():
             raise HTTPException(status_code=500, detail="Nile is not installed")
 
         # Log out first if already authenticated (for re-authentication)
+        _status_cache.pop("amazon", None)
         status = check_auth_status()
         if status.get("authenticated"):
             logout()
@@ -158,8 +187,6 @@ def amazon_auth_start():
 def amazon_auth_complete(body: AmazonAuthCompleteRequest):
     """Complete Amazon OAuth flow - register with auth code."""
     try:
-        from ..sources.amazon import complete_auth
-
         code = body.code.strip()
         session_id = body.session_id.strip() if body.session_id else ""
 
@@ -181,6 +208,7 @@ def amazon_auth_complete(body: AmazonAuthCompleteRequest):
             code_verifier=auth_data.get("code_verifier"),
             serial=auth_data.get("serial"),
         )
+        _status_cache.pop("amazon", None)
 
         if success:
             return {"success": True, "message": message}
@@ -196,23 +224,25 @@ def amazon_auth_complete(body: AmazonAuthCompleteRequest):
 @router.get("/api/amazon/auth/status")
 def amazon_auth_status():
     """Check Amazon authentication status via Nile."""
-    try:
-        from ..sources.amazon import is_nile_installed, check_auth_status
+    cached = _get_cached_status("amazon")
+    if cached is not None:
+        return cached
 
+    try:
         if not is_nile_installed():
-            return {
+            return _cache_status("amazon", {
                 "authenticated": False,
                 "nile_installed": False,
                 "error": "Nile is not installed"
-            }
+            })
 
         status = check_auth_status()
-        return {
+        return _cache_status("amazon", {
             "authenticated": status.get("authenticated", False),
             "nile_installed": True,
             "username": status.get("username"),
             "error": status.get("error"),
-        }
+        })
 
     except Exception as e:
         return {"authenticated": False, "error": str(e)}
@@ -2,19 +2,17 @@
 # Collections page and API routes
 
 import sqlite3
-from pathlib import Path
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 
 from ..dependencies import get_db
 from ..utils.helpers import parse_json_field, group_games_by_igdb
+from ..templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory=Path(__file__).parent.parent / "templates")
 
 
 class CreateCollectionRequest(BaseModel):
@@ -51,24 +49,30 @@ def collections_page(request: Request, conn: sqlite3.Connection = Depends(get_db
     """)
     collections = cursor.fetchall()
 
-    # Get cover images for each collection (up to 4 games)
+    # Get cover images for all collections in one query (latest 4 games each)
+    cursor.execute("""
+        SELECT collection_id, cover FROM (
+            SELECT
+                cg.collection_id,
+                COALESCE(NULLIF(g.igdb_cover_url, ''), g.cover_image) as cover,
+                ROW_NUMBER() OVER (
+                    PARTITION BY cg.collection_id ORDER BY cg.added_at DESC
+                ) as position
+            FROM collection_games cg
+            JOIN games g ON cg.game_id = g.id
+        )
+        WHERE position <= 4
+        ORDER BY collection_id, position
+    """)
+    covers_by_collection = {}
+    for row in cursor.fetchall():
+        if row["cover"]:
+            covers_by_collection.setdefault(row["collection_id"], []).append(row["cover"])
+
     collections_with_covers = []
     for collection in collections:
         collection_dict = dict(collection)
-        cursor.execute("""
-            SELECT g.igdb_cover_url, g.cover_image
-            FROM collection_games cg
-            JOIN games g ON cg.game_id = g.id
-            WHERE cg.collection_id = ?
-            ORDER BY cg.added_at DESC
-            LIMIT 4
-        """, (collection_dict["id"],))
-        covers = []
-        for row in cursor.fetchall():
-            cover = row["igdb_cover_url"] or row["cover_image"]
-            if cover:
-                covers.append(cover)
-        collection_dict["covers"] = covers
+        collection_dict["covers"] = covers_by_collection.get(collection_dict["id"], [])
         collections_with_covers.append(collection_dict)
 
     return templates.TemplateResponse(
@@ -224,18 +228,19 @@ def api_add_game_to_collection(collection_id: int, body: AddGameRequest, conn: s
     if not cursor.fetchone():
         raise HTTPException(status_code=404, detail="Game not found")
 
-    # Try to add (ignore if already exists)
+    # Try to add (the primary key dedupes; ignore if already exists)
     try:
         cursor.execute(
             "INSERT OR IGNORE INTO collection_games (collection_id, game_id) VALUES (?, ?)",
             (collection_id, game_id)
         )
-        # Update collection's updated_at
-        cursor.execute(
-            "UPDATE collections SET updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-            (collection_id,)
-        )
-        conn.commit()
+        # Update collection's updated_at only when a row was actually added
+        if cursor.rowcount:
+            cursor.execute(
+                "UPDATE collections SET updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (collection_id,)
+            )
+            conn.commit()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -6,18 +6,22 @@ import random
 import sqlite3
 import time
 from concurrent.futures import ThreadPoolExecutor
-from pathlib import Path
 
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
 
-from ..dependencies import get_db
+from ..dependencies import get_read_db
+from ..services.igdb_sync import (
+    IGDBClient,
+    POPULARITY_TYPE_IGDB_VISITS, POPULARITY_TYPE_IGDB_WANT_TO_PLAY,
+    POPULARITY_TYPE_IGDB_PLAYING, POPULARITY_TYPE_IGDB_PLAYED,
+    POPULARITY_TYPE_STEAM_PEAK_24H, POPULARITY_TYPE_STEAM_POSITIVE_REVIEWS
+)
 from ..utils.filters import EXCLUDE_HIDDEN_FILTER
 from ..utils.helpers import parse_json_field
+from ..templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory=Path(__file__).parent.parent / "templates")
 
 # Module-level IGDB cache
 _igdb_cache = {
@@ -106,13 +110,6 @@ def _empty_igdb_result():
 
 def _fetch_igdb_sections(igdb_ids, igdb_to_local):
     """Fetch all IGDB popularity data in parallel, using cache if available."""
-    from ..services.igdb_sync import (
-        IGDBClient,
-        POPULARITY_TYPE_IGDB_VISITS, POPULARITY_TYPE_IGDB_WANT_TO_PLAY,
-        POPULARITY_TYPE_IGDB_PLAYING, POPULARITY_TYPE_IGDB_PLAYED,
-        POPULARITY_TYPE_STEAM_PEAK_24H, POPULARITY_TYPE_STEAM_POSITIVE_REVIEWS
-    )
-
     if not igdb_ids:
         return _empty_igdb_result()
 
@@ -219,7 +216,7 @@ def _game_to_json(game):
 
 
 @router.get("/discover", response_class=HTMLResponse)
-def discover(request: Request, conn: sqlite3.Connection = Depends(get_db)):
+def discover(request: Request, conn: sqlite3.Connection = Depends(get_read_db)):
     """Discover page - renders immediately with DB data, IGDB sections load via AJAX."""
     library_games = _get_library_games(conn)
     igdb_to_local, igdb_ids, unique_games = _build_igdb_mapping(library_games)
@@ -246,7 +243,7 @@ def discover(request: Request, conn: sqlite3.Connection = Depends(get_db)):
 
 
 @router.get("/api/discover/igdb-sections")
-def discover_igdb_sections(conn: sqlite3.Connection = Depends(get_db)):
+def discover_igdb_sections(conn: sqlite3.Connection = Depends(get_read_db)):
     """API endpoint returning IGDB popularity sections as JSON."""
     library_games = _get_library_games(conn)
     igdb_to_local, igdb_ids, unique_games = _build_igdb_mapping(library_games)
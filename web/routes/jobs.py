@@ -2,10 +2,15 @@
 # Job status and management API routes
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 
 from ..services.jobs import get_job, get_active_jobs, get_recent_jobs
 
-router = APIRouter(tags=["Jobs"])
+router = APIRouter(tags=["Jobs"], default_response_class=ORJSONResponse)
+
+# These endpoints are polled by the UI while jobs run. Job rows only hold
+# strings, numbers and None, so responses are built directly instead of going
+# through FastAPI's jsonable_encoder pass.
 
 
 @router.get("/api/jobs")
@@ -20,14 +25,14 @@ def list_jobs():
         if job["id"] not in job_ids:
             active.append(job)
 
-    return {"success": True, "jobs": active}
+    return ORJSONResponse({"success": True, "jobs": active})
 
 
 @router.get("/api/jobs/active")
 def list_active_jobs():
     """Get only active (pending/running) jobs."""
     jobs = get_active_jobs()
-    return {"success": True, "jobs": jobs}
+    return ORJSONResponse({"success": True, "jobs": jobs})
 
 
 @router.get("/api/jobs/{job_id}")
@@ -43,10 +48,10 @@ def get_job_status(job_id: str):
     if job["total"] and job["total"] > 0:
         percentage = int((job["progress"] / job["total"]) * 100)
 
-    return {
+    return ORJSONResponse({
         "success": True,
         "job": {
             **job,
             "percentage": percentage
         }
-    }
+    })
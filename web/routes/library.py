@@ -3,19 +3,41 @@
 
 import json
 import sqlite3
-from pathlib import Path
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 
-from ..dependencies import get_db
+from ..dependencies import get_read_db
 from ..utils.filters import EXCLUDE_HIDDEN_FILTER, EXCLUDE_DUPLICATES_FILTER, PLAYTIME_LABELS
 from ..utils.helpers import parse_json_field, get_store_url, group_games_by_igdb, escape_like
+from ..templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory=Path(__file__).parent.parent / "templates")
+
+# Columns the library page can be sorted by (filtered against the actual schema per request)
+_VALID_SORTS: frozenset[str] = frozenset({
+    "name", "store", "playtime_hours", "critics_score", "release_date", "total_rating",
+    "igdb_rating", "aggregated_rating", "average_rating", "metacritic_score", "metacritic_user_score",
+})
+
+# Rating columns where games without a value are always listed last
+_NULLS_LAST_SORTS: frozenset[str] = frozenset({
+    "critics_score", "total_rating", "igdb_rating", "aggregated_rating", "average_rating",
+    "metacritic_score", "metacritic_user_score",
+})
+
+# ProtonDB tier hierarchy, best first
+_PROTONDB_HIERARCHY = ("platinum", "gold", "silver", "bronze")
+
+# Sort value used for playtime_hours when only a manual playtime_label is set
+_PLAYTIME_LABEL_SENTINEL = {
+    "heavily_played": 1000,
+    "abandoned": 50,
+    "played": 11,
+    "tried": 1,
+    "unplayed": 0,
+}
 
 
 @router.get("/", response_class=RedirectResponse)
@@ -37,7 +59,7 @@ def library(
     protondb_tier: str = "",
     no_igdb: bool = False,
     playtime_label: list[str] = Query(default=[]),
-    conn: sqlite3.Connection = Depends(get_db)
+    conn: sqlite3.Connection = Depends(get_read_db)
 ):
     """Library page - list all games."""
     cursor = conn.cursor()
@@ -69,10 +91,9 @@ def library(
         params.append(collection)
 
     # ProtonDB tier filter (hierarchy: platinum > gold > silver > bronze)
-    protondb_hierarchy = ["platinum", "gold", "silver", "bronze"]
-    if protondb_tier and protondb_tier in protondb_hierarchy:
-        tier_index = protondb_hierarchy.index(protondb_tier)
-        allowed_tiers = protondb_hierarchy[:tier_index + 1]
+    if protondb_tier and protondb_tier in _PROTONDB_HIERARCHY:
+        tier_index = _PROTONDB_HIERARCHY.index(protondb_tier)
+        allowed_tiers = _PROTONDB_HIERARCHY[:tier_index + 1]
         placeholders = ",".join("?" * len(allowed_tiers))
         query += f" AND protondb_tier IN ({placeholders})"
         params.extend(allowed_tiers)
@@ -114,8 +135,7 @@ def library(
     # Sorting - detect which columns actually exist in the DB
     cursor.execute("PRAGMA table_info(games)")
     existing_columns = {row[1] for row in cursor.fetchall()}
-    valid_sorts = ["name", "store", "playtime_hours", "critics_score", "release_date", "total_rating", "igdb_rating", "aggregated_rating", "average_rating", "metacritic_score", "metacritic_user_score"]
-    available_sorts = [s for s in valid_sorts if s in existing_columns]
+    available_sorts = _VALID_SORTS & existing_columns
     if sort not in available_sorts:
         sort = "name"
     if sort in available_sorts:
@@ -134,7 +154,7 @@ def library(
                     ELSE NULL
                 END
             ) {order_dir} NULLS LAST"""
-        elif sort in ["critics_score", "total_rating", "igdb_rating", "aggregated_rating", "average_rating", "metacritic_score", "metacritic_user_score"]:
+        elif sort in _NULLS_LAST_SORTS:
             query += f" ORDER BY {sort} {order_dir} NULLS LAST"
         else:
             query += f" ORDER BY {sort} COLLATE NOCASE {order_dir}"
@@ -153,14 +173,6 @@ def library(
     # Separate games with null sort values so nulls are always last
     reverse = order == "desc"
 
-    _PLAYTIME_LABEL_SENTINEL = {
-        "heavily_played": 1000,
-        "abandoned": 50,
-        "played": 11,
-        "tried": 1,
-        "unplayed": 0,
-    }
-
     def effective_sort_value(game: dict, field: str):
         """Return the value used for sorting, applying label-based fallback for playtime_hours."""
         val = game.get(field)
@@ -260,7 +272,7 @@ def library(
 
 
 @router.get("/game/{game_id}", response_class=HTMLResponse)
-def game_detail(request: Request, game_id: int, conn: sqlite3.Connection = Depends(get_db)):
+def game_detail(request: Request, game_id: int, conn: sqlite3.Connection = Depends(get_read_db)):
     """Game detail page - shows combined view for games owned on multiple stores."""
     cursor = conn.cursor()
 
@@ -317,7 +329,7 @@ def game_detail(request: Request, game_id: int, conn: sqlite3.Connection = Depen
 
 
 @router.get("/random", response_class=RedirectResponse)
-def random_game(conn: sqlite3.Connection = Depends(get_db)):
+def random_game(conn: sqlite3.Connection = Depends(get_read_db)):
     """Redirect to a random game detail page."""
     cursor = conn.cursor()
 
@@ -337,7 +349,7 @@ def random_game(conn: sqlite3.Connection = Depends(get_db)):
 def hidden_games(
     request: Request,
     search: str = Query(default="", max_length=200),
-    conn: sqlite3.Connection = Depends(get_db)
+    conn: sqlite3.Connection = Depends(get_read_db)
 ):
     """Page showing all hidden games."""
     cursor = conn.cursor()
@@ -369,7 +381,7 @@ def hidden_games(
 def removed_games(
     request: Request,
     search: str = Query(default="", max_length=200),
-    conn: sqlite3.Connection = Depends(get_db)
+    conn: sqlite3.Connection = Depends(get_read_db)
 ):
     """Page showing all removed games."""
     cursor = conn.cursor()
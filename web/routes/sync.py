@@ -4,19 +4,39 @@
 import json
 import re
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from enum import Enum
+from functools import partial
 from typing import List, Optional
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
-from ..config import DATABASE_PATH
+from ..database import connect
+from ..services.database_builder import (
+    create_database, import_steam_games, import_epic_games,
+    import_gog_games as import_gog_games_from_galaxy, import_itch_games,
+    import_humble_games, import_battlenet_games, import_amazon_games,
+    import_ea_games, import_xbox_games, import_local_games
+)
+from ..services.igdb_sync import IGDBClient, sync_games as igdb_sync_games, add_igdb_columns
+from ..services.metacritic_sync import (
+    MetacriticClient, sync_games as metacritic_sync_games, add_metacritic_columns
+)
+from ..services.protondb_sync import (
+    ProtonDBClient, sync_games as protondb_sync_games, add_protondb_columns
+)
+from ..services.settings import (
+    get_settings_bulk, STEAM_ID, STEAM_API_KEY, HUMBLE_SESSION_COOKIE,
+    BATTLENET_SESSION_COOKIE, EA_BEARER_TOKEN, XBOX_XSTS_TOKEN, XBOX_GAMEPASS_PLAN
+)
 from ..services.jobs import (
     JobType, create_job, update_job_progress, complete_job, fail_job, run_job_async
 )
 
-router = APIRouter(tags=["Sync"])
+router = APIRouter(tags=["Sync"], default_response_class=ORJSONResponse)
 
 
 class StoreType(str, Enum):
@@ -34,197 +54,136 @@ class StoreType(str, Enum):
     all = "all"
 
 
-@router.post("/api/sync/store/{store}")
-def sync_store(store: StoreType):
-    """Sync games from a store."""
-    # Import here to avoid circular imports
-    from ..services.database_builder import (
-        create_database, import_steam_games, import_epic_games,
-        import_gog_games, import_itch_games, import_humble_games,
-        import_battlenet_games, import_amazon_games, import_ea_games,
-        import_xbox_games, import_local_games
-    )
-
+# Importer for each store, in the order "all" syncs them
+_STORE_IMPORTERS = {
+    StoreType.steam: import_steam_games,
+    StoreType.epic: import_epic_games,
+    StoreType.gog: import_gog_games_from_galaxy,
+    StoreType.itch: import_itch_games,
+    StoreType.humble: import_humble_games,
+    StoreType.battlenet: import_battlenet_games,
+    StoreType.amazon: import_amazon_games,
+    StoreType.ea: import_ea_games,
+    StoreType.xbox: import_xbox_games,
+    StoreType.local: import_local_games,
+}
+
+# (store name, importer) pairs to run for each sync request; "all" runs every store
+_STORE_SYNC_PLANS = {
+    store_type: [(store_type.value, import_func)]
+    for store_type, import_func in _STORE_IMPORTERS.items()
+}
+_STORE_SYNC_PLANS[StoreType.all] = [
+    (store_type.value, import_func) for store_type, import_func in _STORE_IMPORTERS.items()
+]
+
+# Importers to use instead when a sync is forced, for stores that cache data
+# between syncs (Steam keeps review scores for a week)
+_STORE_FORCE_IMPORTERS = {
+    StoreType.steam.value: partial(import_steam_games, force=True),
+}
+
+# Stores that can't import anything without credentials from Settings. When
+# syncing "all", stores whose check fails on the configured values are skipped
+# instead of running their importer just to print setup instructions.
+_STORE_CONFIGURED_CHECKS = {
+    "steam": lambda values: values.get(STEAM_ID) and values.get(STEAM_API_KEY),
+    "humble": lambda values: values.get(HUMBLE_SESSION_COOKIE),
+    "battlenet": lambda values: values.get(BATTLENET_SESSION_COOKIE),
+    "ea": lambda values: values.get(EA_BEARER_TOKEN),
+    "xbox": lambda values: (
+        values.get(XBOX_XSTS_TOKEN) or values.get(XBOX_GAMEPASS_PLAN, "none") != "none"
+    ),
+}
+_STORE_CREDENTIAL_KEYS = [
+    STEAM_ID, STEAM_API_KEY, HUMBLE_SESSION_COOKIE, BATTLENET_SESSION_COOKIE,
+    EA_BEARER_TOKEN, XBOX_XSTS_TOKEN, XBOX_GAMEPASS_PLAN,
+]
+
+
+# Upper bound on stores imported concurrently by one sync job
+_MAX_STORE_SYNC_WORKERS = 8
+
+
+def _run_store_import(import_func):
+    """Run one store importer on its own connection (connections aren't shared across threads)."""
+    # Importers write in a burst after fetching, so wait out another store's commit
+    conn = connect(timeout=30)
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        # Ensure database tables exist
-        create_database()
-        conn = sqlite3.connect(DATABASE_PATH)
-
-        results = {}
-
-        if store == StoreType.steam or store == StoreType.all:
-            results["steam"] = import_steam_games(conn)
-
-        if store == StoreType.epic or store == StoreType.all:
-            results["epic"] = import_epic_games(conn)
-
-        if store == StoreType.gog or store == StoreType.all:
-            results["gog"] = import_gog_games(conn)
-
-        if store == StoreType.itch or store == StoreType.all:
-            results["itch"] = import_itch_games(conn)
-
-        if store == StoreType.humble or store == StoreType.all:
-            results["humble"] = import_humble_games(conn)
-
-        if store == StoreType.battlenet or store == StoreType.all:
-            results["battlenet"] = import_battlenet_games(conn)
-
-        if store == StoreType.amazon or store == StoreType.all:
-            results["amazon"] = import_amazon_games(conn)
-
-        if store == StoreType.ea or store == StoreType.all:
-            results["ea"] = import_ea_games(conn)
-
-        if store == StoreType.xbox or store == StoreType.all:
-            results["xbox"] = import_xbox_games(conn)
-
-        if store == StoreType.local or store == StoreType.all:
-            results["local"] = import_local_games(conn)
-
+        return import_func(conn)
+    finally:
         conn.close()
 
-        if store == StoreType.all:
-            total = sum(results.values())
-            message = f"Synced {total} games: " + ", ".join(
-                f"{s.capitalize()}: {c}" for s, c in results.items()
-            )
-        else:
-            count = results.get(store.value, 0)
-            message = f"Synced {count} games from {store.value.capitalize()}"
 
-        return {"success": True, "message": message, "results": results}
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.post("/api/sync/igdb/{mode}")
-def sync_igdb(mode: str):
-    """Sync IGDB metadata. Mode can be 'new'/'missing' (unmatched only) or 'all' (resync everything)."""
-    # Import here to avoid circular imports
-    from ..services.igdb_sync import IGDBClient, sync_games as igdb_sync_games, add_igdb_columns
-
-    try:
-        conn = sqlite3.connect(DATABASE_PATH)
-
-        # Ensure IGDB columns exist
-        add_igdb_columns(conn)
-
-        # Initialize client
-        client = IGDBClient()
-
-        # Sync games (force=True for 'all' mode)
-        force = (mode == "all")
-        matched, failed = igdb_sync_games(conn, client, force=force)
-
-        conn.close()
-
-        message = f"IGDB sync complete: {matched} matched, {failed} failed/no match"
-        return {"success": True, "message": message, "matched": matched, "failed": failed}
-
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.post("/api/sync/metacritic/{mode}")
-def sync_metacritic(mode: str):
-    """Sync Metacritic scores. Mode can be 'missing' (unmatched only) or 'all' (resync everything)."""
-    # Import here to avoid circular imports
-    from ..services.metacritic_sync import (
-        MetacriticClient, sync_games as metacritic_sync_games, add_metacritic_columns
-    )
-
-    try:
-        conn = sqlite3.connect(DATABASE_PATH)
-
-        # Ensure Metacritic columns exist
-        add_metacritic_columns(conn)
-
-        # Initialize client
-        client = MetacriticClient()
-
-        # Sync games (force=True for 'all' mode)
-        force = (mode == "all")
-        matched, failed = metacritic_sync_games(conn, client, force=force)
-
-        conn.close()
-
-        message = f"Metacritic sync complete: {matched} matched, {failed} failed/no match"
-        return {"success": True, "message": message, "matched": matched, "failed": failed}
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+def _configured_stores(plan, conn=None):
+    """Drop stores from a sync plan whose required credentials are not set."""
+    values = {k: v.strip() for k, v in get_settings_bulk(_STORE_CREDENTIAL_KEYS, conn).items()}
+    return [
+        (store_name, import_func) for store_name, import_func in plan
+        if store_name not in _STORE_CONFIGURED_CHECKS
+        or _STORE_CONFIGURED_CHECKS[store_name](values)
+    ]
 
 
 # =============================================================================
-# Async Job-based Sync Endpoints
+# Job-based Sync Endpoints
 # =============================================================================
+# Syncs take minutes of network I/O, so every endpoint starts a background job
+# and returns its ID immediately; clients poll /api/jobs/{id} for progress.
+# The plain routes are kept as aliases of the /async ones for existing callers.
 
+@router.post("/api/sync/store/{store}")
 @router.post("/api/sync/store/{store}/async")
-def sync_store_async(store: StoreType):
-    """Start a background job to sync games from a store. Returns job ID for tracking."""
-    from ..services.database_builder import (
-        create_database, import_steam_games, import_epic_games,
-        import_gog_games, import_itch_games, import_humble_games,
-        import_battlenet_games, import_amazon_games, import_ea_games,
-        import_xbox_games, import_local_games
-    )
+def sync_store_async(store: StoreType, force: bool = False):
+    """Start a background job to sync games from a store. Returns job ID for tracking.
 
+    With ``force``, stores that cache data between syncs fetch it all again.
+    """
     store_name = "all stores" if store == StoreType.all else store.value.capitalize()
     job_id = create_job(JobType.STORE_SYNC, f"Starting {store_name} sync...")
 
     def run_sync(job_id: str):
         try:
-            # Ensure database tables exist
-            create_database()
-            conn = sqlite3.connect(DATABASE_PATH)
-
-            stores_to_sync = []
-            if store == StoreType.all:
-                stores_to_sync = [
-                    ("steam", import_steam_games),
-                    ("epic", import_epic_games),
-                    ("gog", import_gog_games),
-                    ("itch", import_itch_games),
-                    ("humble", import_humble_games),
-                    ("battlenet", import_battlenet_games),
-                    ("amazon", import_amazon_games),
-                    ("ea", import_ea_games),
-                    ("xbox", import_xbox_games),
-                    ("local", import_local_games),
-                ]
-            else:
-                store_map = {
-                    StoreType.steam: ("steam", import_steam_games),
-                    StoreType.epic: ("epic", import_epic_games),
-                    StoreType.gog: ("gog", import_gog_games),
-                    StoreType.itch: ("itch", import_itch_games),
-                    StoreType.humble: ("humble", import_humble_games),
-                    StoreType.battlenet: ("battlenet", import_battlenet_games),
-                    StoreType.amazon: ("amazon", import_amazon_games),
-                    StoreType.ea: ("ea", import_ea_games),
-                    StoreType.xbox: ("xbox", import_xbox_games),
-                    StoreType.local: ("local", import_local_games),
-                }
-                if store in store_map:
-                    stores_to_sync = [store_map[store]]
+            # Ensure database tables exist, and read store credentials on the
+            # same connection; each importer then opens its own
+            conn = connect()
+            try:
+                create_database(conn)
+                # Ubisoft has no importer here (it is imported via the bookmarklet
+                # endpoint), so it syncs nothing rather than failing the job
+                stores_to_sync = _STORE_SYNC_PLANS.get(store, [])
+                if store == StoreType.all:
+                    stores_to_sync = _configured_stores(stores_to_sync, conn)
+                if force:
+                    stores_to_sync = [
+                        (name, _STORE_FORCE_IMPORTERS.get(name, import_func))
+                        for name, import_func in stores_to_sync
+                    ]
+            finally:
+                conn.close()
 
             total = len(stores_to_sync)
             results = {}
 
-            for i, (store_name, import_func) in enumerate(stores_to_sync, 1):
-                update_job_progress(job_id, i, total, f"Syncing {store_name.capitalize()}...")
-                try:
-                    count = import_func(conn)
-                    results[store_name] = count
-                except Exception as e:
-                    results[store_name] = f"Error: {str(e)}"
+            update_job_progress(job_id, 0, total, f"Syncing {store_name}...")
 
-            conn.close()
+            # Each store is dominated by network I/O to its own provider, so
+            # they run side by side; only their final writes contend
+            with ThreadPoolExecutor(max_workers=max(1, min(_MAX_STORE_SYNC_WORKERS, total))) as executor:
+                futures = {
+                    executor.submit(_run_store_import, import_func): name
+                    for name, import_func in stores_to_sync
+                }
+                for completed, future in enumerate(as_completed(futures), 1):
+                    name = futures[future]
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        results[name] = f"Error: {str(e)}"
+                    update_job_progress(job_id, completed, total, f"Synced {name.capitalize()}")
+
+            # Report stores in sync plan order rather than completion order
+            results = {name: results[name] for name, _ in stores_to_sync}
 
             # Build result message
             if store == StoreType.all:
@@ -236,7 +195,7 @@ def sync_store_async(store: StoreType):
                 count = results.get(store.value, 0)
                 message = f"Synced {count} games from {store.value.capitalize()}"
 
-            complete_job(job_id, json.dumps(results), message)
+            complete_job(job_id, results, message)
 
         except Exception as e:
             fail_job(job_id, str(e))
@@ -246,17 +205,16 @@ def sync_store_async(store: StoreType):
     return {"success": True, "job_id": job_id, "message": f"Started {store_name} sync job"}
 
 
+@router.post("/api/sync/igdb/{mode}")
 @router.post("/api/sync/igdb/{mode}/async")
 def sync_igdb_async(mode: str):
     """Start a background job to sync IGDB metadata. Returns job ID for tracking."""
-    from ..services.igdb_sync import IGDBClient, sync_games as igdb_sync_games, add_igdb_columns
-
     mode_text = "all games" if mode == "all" else "missing metadata"
     job_id = create_job(JobType.IGDB_SYNC, f"Starting IGDB sync ({mode_text})...")
 
     def run_sync(job_id: str):
         try:
-            conn = sqlite3.connect(DATABASE_PATH)
+            conn = connect()
             conn.row_factory = sqlite3.Row
 
             # Ensure IGDB columns exist
@@ -264,7 +222,8 @@ def sync_igdb_async(mode: str):
 
             update_job_progress(job_id, 0, 1, f"Initializing IGDB sync...")
 
-            # Progress callback to update job status
+            # Progress callback to update job status (update_job_progress
+            # coalesces the per-game calls into periodic writes)
             def on_progress(current, total, message):
                 update_job_progress(job_id, current, total, message)
 
@@ -276,7 +235,7 @@ def sync_igdb_async(mode: str):
             conn.close()
 
             message = f"IGDB sync complete: {matched} matched, {failed} failed/no match"
-            complete_job(job_id, json.dumps({"matched": matched, "failed": failed}), message)
+            complete_job(job_id, {"matched": matched, "failed": failed}, message)
 
         except Exception as e:
             fail_job(job_id, str(e))
@@ -286,19 +245,16 @@ def sync_igdb_async(mode: str):
     return {"success": True, "job_id": job_id, "message": f"Started IGDB sync job ({mode_text})"}
 
 
+@router.post("/api/sync/metacritic/{mode}")
 @router.post("/api/sync/metacritic/{mode}/async")
 def sync_metacritic_async(mode: str):
     """Start a background job to sync Metacritic scores. Returns job ID for tracking."""
-    from ..services.metacritic_sync import (
-        MetacriticClient, sync_games as metacritic_sync_games, add_metacritic_columns
-    )
-
     mode_text = "all games" if mode == "all" else "missing scores"
     job_id = create_job(JobType.METACRITIC_SYNC, f"Starting Metacritic sync ({mode_text})...")
 
     def run_sync(job_id: str):
         try:
-            conn = sqlite3.connect(DATABASE_PATH)
+            conn = connect()
             conn.row_factory = sqlite3.Row
 
             # Ensure Metacritic columns exist
@@ -306,7 +262,8 @@ def sync_metacritic_async(mode: str):
 
             update_job_progress(job_id, 0, 1, f"Initializing Metacritic sync...")
 
-            # Progress callback to update job status
+            # Progress callback to update job status (update_job_progress
+            # coalesces the per-game calls into periodic writes)
             def on_progress(current, total, message):
                 update_job_progress(job_id, current, total, message)
 
@@ -318,7 +275,7 @@ def sync_metacritic_async(mode: str):
             conn.close()
 
             message = f"Metacritic sync complete: {matched} matched, {failed} failed/no match"
-            complete_job(job_id, json.dumps({"matched": matched, "failed": failed}), message)
+            complete_job(job_id, {"matched": matched, "failed": failed}, message)
 
         except Exception as e:
             fail_job(job_id, str(e))
@@ -329,47 +286,15 @@ def sync_metacritic_async(mode: str):
 
 
 @router.post("/api/sync/protondb/{mode}")
-def sync_protondb(mode: str):
-    """Sync ProtonDB data. Mode can be 'missing' (unmatched only) or 'all' (resync everything)."""
-    from ..services.protondb_sync import (
-        ProtonDBClient, sync_games as protondb_sync_games, add_protondb_columns
-    )
-
-    try:
-        conn = sqlite3.connect(DATABASE_PATH)
-
-        # Ensure ProtonDB columns exist
-        add_protondb_columns(conn)
-
-        # Initialize client
-        client = ProtonDBClient()
-
-        # Sync games (force=True for 'all' mode)
-        force = (mode == "all")
-        matched, failed = protondb_sync_games(conn, client, force=force)
-
-        conn.close()
-
-        message = f"ProtonDB sync complete: {matched} matched, {failed} failed/no data"
-        return {"success": True, "message": message, "matched": matched, "failed": failed}
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
 @router.post("/api/sync/protondb/{mode}/async")
 def sync_protondb_async(mode: str):
     """Start a background job to sync ProtonDB data. Returns job ID for tracking."""
-    from ..services.protondb_sync import (
-        ProtonDBClient, sync_games as protondb_sync_games, add_protondb_columns
-    )
-
     mode_text = "all Steam games" if mode == "all" else "missing data"
     job_id = create_job(JobType.PROTONDB_SYNC, f"Starting ProtonDB sync ({mode_text})...")
 
     def run_sync(job_id: str):
         try:
-            conn = sqlite3.connect(DATABASE_PATH)
+            conn = connect()
             conn.row_factory = sqlite3.Row
 
             # Ensure ProtonDB columns exist
@@ -377,7 +302,8 @@ def sync_protondb_async(mode: str):
 
             update_job_progress(job_id, 0, 1, f"Initializing ProtonDB sync...")
 
-            # Progress callback to update job status
+            # Progress callback to update job status (update_job_progress
+            # coalesces the per-game calls into periodic writes)
             def on_progress(current, total, message):
                 update_job_progress(job_id, current, total, message)
 
@@ -389,7 +315,7 @@ def sync_protondb_async(mode: str):
             conn.close()
 
             message = f"ProtonDB sync complete: {matched} matched, {failed} failed/no data"
-            complete_job(job_id, json.dumps({"matched": matched, "failed": failed}), message)
+            complete_job(job_id, {"matched": matched, "failed": failed}, message)
 
         except Exception as e:
             fail_job(job_id, str(e))
@@ -421,31 +347,103 @@ class GOGImportRequest(BaseModel):
     games: List[GOGGame]
 
 
+# Ubisoft playtime strings look like "10 hours" or "2 hours 30 minutes"
+_PLAYTIME_HOURS_RE = re.compile(r'(\d+)\s*hour')
+_PLAYTIME_MINS_RE = re.compile(r'(\d+)\s*min')
+# Stable store_id from a lowercased title: spaces become dashes, ':' and "'" are dropped
+_UBISOFT_STORE_ID_TABLE = str.maketrans({" ": "-", ":": None, "'": None})
+
+# Shared compact encoder for bookmarklet extra_data
+_json_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+# Upserts for bookmarklet imports. {values} is filled with one placeholder
+# group per row, so a batch of rows goes through a single statement.
+_UBISOFT_UPSERT_SQL = """
+    INSERT INTO games (
+        name, store, store_id, playtime_hours, extra_data, updated_at
+    ) VALUES {values}
+    ON CONFLICT(store, store_id) DO UPDATE SET
+        name = excluded.name,
+        playtime_hours = excluded.playtime_hours,
+        extra_data = excluded.extra_data,
+        updated_at = excluded.updated_at
+"""
+_GOG_UPSERT_SQL = """
+    INSERT INTO games (
+        name, store, store_id, extra_data, updated_at
+    ) VALUES {values}
+    ON CONFLICT(store, store_id) DO UPDATE SET
+        name = excluded.name,
+        extra_data = excluded.extra_data,
+        updated_at = excluded.updated_at
+"""
+# Rows per multi-row INSERT; keeps bound parameters well under SQLite's limit
+_IMPORT_BATCH_SIZE = 100
+# Expanded statements keyed by (template, row count, columns per row)
+_multirow_sql_cache = {}
+
+
+def _multirow_sql(template, row_count, column_count):
+    """Expand an upsert template to insert row_count rows in one statement."""
+    key = (template, row_count, column_count)
+    sql = _multirow_sql_cache.get(key)
+    if sql is None:
+        row = "(" + ", ".join("?" * column_count) + ")"
+        sql = template.format(values=", ".join([row] * row_count))
+        _multirow_sql_cache[key] = sql
+    return sql
+
+
+def _encode_extra_data(extra_data):
+    """Encode extra_data as JSON, or None when none of its fields are set."""
+    if all(value is None for value in extra_data.values()):
+        return None
+    return _json_encode(extra_data)
+
+
+def _upsert_imported_games(template, rows):
+    """Upsert bookmarklet-imported rows in a single write transaction."""
+    # Autocommit mode: the schema check runs outside any transaction and the
+    # upserts inside the explicit one below, with no implicit BEGINs
+    conn = connect(isolation_level=None)
+    try:
+        # Ensure database exists
+        create_database(conn)
+        conn.execute("BEGIN IMMEDIATE")
+        for start in range(0, len(rows), _IMPORT_BATCH_SIZE):
+            batch = rows[start:start + _IMPORT_BATCH_SIZE]
+            conn.execute(
+                _multirow_sql(template, len(batch), len(batch[0])),
+                [value for row in batch for value in row],
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
 @router.post("/api/import/ubisoft")
 def import_ubisoft_games(request: UbisoftImportRequest):
     """Import games scraped from Ubisoft account page."""
-    from ..services.database_builder import create_database
-
     try:
-        # Ensure database exists
-        create_database()
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
-        count = 0
+        now = datetime.now().isoformat()
+        rows = []
         for game in request.games:
             try:
                 # Parse playtime string (e.g. "10 hours", "2 hours 30 minutes")
                 playtime_hours = None
                 if game.playtime:
-                    hours_match = re.search(r'(\d+)\s*hour', game.playtime)
-                    mins_match = re.search(r'(\d+)\s*min', game.playtime)
+                    hours_match = _PLAYTIME_HOURS_RE.search(game.playtime)
+                    mins_match = _PLAYTIME_MINS_RE.search(game.playtime)
                     hours = int(hours_match.group(1)) if hours_match else 0
                     mins = int(mins_match.group(1)) if mins_match else 0
                     playtime_hours = hours + (mins / 60) if (hours or mins) else None
 
                 # Create a stable store_id from title
-                store_id = game.title.lower().replace(' ', '-').replace(':', '').replace("'", "")
+                store_id = game.title.lower().translate(_UBISOFT_STORE_ID_TABLE)
 
                 # Store extra data
                 extra_data = {
@@ -454,29 +452,19 @@ def import_ubisoft_games(request: UbisoftImportRequest):
                     "platform": game.platform
                 }
 
-                cursor.execute("""
-                    INSERT INTO games (
-                        name, store, store_id, playtime_hours, extra_data, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(store, store_id) DO UPDATE SET
-                        name = excluded.name,
-                        playtime_hours = excluded.playtime_hours,
-                        extra_data = excluded.extra_data,
-                        updated_at = excluded.updated_at
-                """, (
+                rows.append((
                     game.title,
                     "ubisoft",
                     store_id,
                     playtime_hours,
-                    json.dumps(extra_data),
-                    datetime.now().isoformat()
+                    _encode_extra_data(extra_data),
+                    now
                 ))
-                count += 1
             except Exception as e:
                 print(f"  Error importing {game.title}: {e}")
 
-        conn.commit()
-        conn.close()
+        _upsert_imported_games(_UBISOFT_UPSERT_SQL, rows)
+        count = len(rows)
 
         return {
             "success": True,
@@ -491,44 +479,25 @@ def import_ubisoft_games(request: UbisoftImportRequest):
 @router.post("/api/import/gog")
 def import_gog_games(request: GOGImportRequest):
     """Import games scraped from GOG library page."""
-    from ..services.database_builder import create_database
-
     try:
-        # Ensure database exists
-        create_database()
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
-        count = 0
+        now = datetime.now().isoformat()
+        rows = []
         for game in request.games:
-            try:
-                # Store extra data
-                extra_data = {
-                    "profile_url": game.profileUrl,
-                    "store_url": game.storeUrl
-                }
-
-                cursor.execute("""
-                    INSERT INTO games (
-                        name, store, store_id, extra_data, updated_at
-                    ) VALUES (?, ?, ?, ?, ?)
-                    ON CONFLICT(store, store_id) DO UPDATE SET
-                        name = excluded.name,
-                        extra_data = excluded.extra_data,
-                        updated_at = excluded.updated_at
-                """, (
-                    game.title,
-                    "gog",
-                    game.id,
-                    json.dumps(extra_data),
-                    datetime.now().isoformat()
-                ))
-                count += 1
-            except Exception as e:
-                print(f"  Error importing {game.title}: {e}")
-
-        conn.commit()
-        conn.close()
+            # Store extra data
+            extra_data = {
+                "profile_url": game.profileUrl,
+                "store_url": game.storeUrl
+            }
+            rows.append((
+                game.title,
+                "gog",
+                game.id,
+                _encode_extra_data(extra_data),
+                now
+            ))
+
+        _upsert_imported_games(_GOG_UPSERT_SQL, rows)
+        count = len(rows)
 
         return {
             "success": True,
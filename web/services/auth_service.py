@@ -2,86 +2,133 @@
 # Authentication service for optional single-user login
 
 import secrets
-import sqlite3
+import time
 from datetime import datetime, timedelta
 
 import bcrypt
 
-from ..config import DATABASE_PATH, SESSION_EXPIRY_DAYS
-
-
-def _ensure_auth_tables():
-    """Create auth tables if they don't exist."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL UNIQUE,
-            password_hash TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS sessions (
-            id TEXT PRIMARY KEY,
-            user_id INTEGER NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            expires_at TIMESTAMP NOT NULL,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-        )
-    """)
-
-    conn.commit()
-    conn.close()
+from ..config import SESSION_EXPIRY_DAYS
+from ..database import pooled_connection
+from .settings import get_setting, set_setting
+
+# Set once the auth tables are known to exist in this process. They are
+# created at startup, so the per-request checks (validate_session,
+# user_exists) don't call ensure_auth_tables() at all.
+_auth_tables_ready = False
+
+# The app has a single owner account and no way to delete it, so once one is
+# known to exist the middleware's per-request check can skip the query.
+_user_known_to_exist = False
+
+# Checked against when the username is unknown, so failed logins take the
+# same bcrypt time whether or not the account exists
+_DUMMY_PASSWORD_HASH = b"$2b$12$JppNAsGmk3oK4LffPdqpr.brYwU3.EliIGqFVY9db5zfdXenm74TW"
+
+# The session signing key never changes while the app runs (rotating it needs
+# a restart), so it is read from the settings table once
+_secret_key = None
+
+
+def ensure_auth_tables():
+    """Create auth tables if they don't exist (once per process)."""
+    global _auth_tables_ready
+    if _auth_tables_ready:
+        return
+
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL UNIQUE,
+                password_hash TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                expires_at TIMESTAMP NOT NULL,
+                expires_at_ts INTEGER,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            )
+        """)
+
+        # Expiry as UNIX seconds, so checks compare integers instead of ISO text
+        cursor.execute("PRAGMA table_info(sessions)")
+        columns = {row[1] for row in cursor.fetchall()}
+        if "expires_at_ts" not in columns:
+            cursor.execute("ALTER TABLE sessions ADD COLUMN expires_at_ts INTEGER")
+            cursor.execute("""
+                UPDATE sessions
+                SET expires_at_ts = CAST(strftime('%s', expires_at, 'utc') AS INTEGER)
+            """)
+
+        # For the expired-session sweep
+        cursor.execute("DROP INDEX IF EXISTS idx_sessions_expires")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sessions_expires_ts ON sessions(expires_at_ts)
+        """)
+
+        conn.commit()
+
+    _auth_tables_ready = True
 
 
 def user_exists():
     """Check if any user account exists."""
-    _ensure_auth_tables()
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM users")
-    count = cursor.fetchone()[0]
-    conn.close()
-    return count > 0
+    global _user_known_to_exist
+    if _user_known_to_exist:
+        return True
+
+    with pooled_connection(read_only=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM users LIMIT 1")
+        _user_known_to_exist = cursor.fetchone() is not None
+    return _user_known_to_exist
 
 
 def create_user(username, password):
     """Create the single owner account. Refuses if a user already exists."""
-    _ensure_auth_tables()
+    global _user_known_to_exist
+    ensure_auth_tables()
     if user_exists():
         raise ValueError("An account already exists")
 
     password_hash = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
 
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO users (username, password_hash) VALUES (?, ?)",
-        (username, password_hash),
-    )
-    user_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO users (username, password_hash) VALUES (?, ?)",
+            (username, password_hash),
+        )
+        user_id = cursor.lastrowid
+        conn.commit()
+    _user_known_to_exist = True
     return user_id
 
 
 def verify_user(username, password):
     """Verify credentials. Returns user dict or None."""
-    _ensure_auth_tables()
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-    row = cursor.fetchone()
-    conn.close()
+    ensure_auth_tables()
+    with pooled_connection(read_only=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id, username, password_hash FROM users WHERE username = ?", (username,)
+        )
+        row = cursor.fetchone()
 
     if row is None:
+        bcrypt.checkpw(password.encode("utf-8"), _DUMMY_PASSWORD_HASH)
         return None
 
+    # The connection is already back in the pool while bcrypt runs; the login
+    # route is a plain def, so this blocks a threadpool worker, not the event loop
     if bcrypt.checkpw(password.encode("utf-8"), row["password_hash"].encode("utf-8")):
         return {"id": row["id"], "username": row["username"]}
 
@@ -90,70 +137,65 @@ def verify_user(username, password):
 
 def create_session(user_id):
     """Create a new session and return the session ID."""
-    _ensure_auth_tables()
+    ensure_auth_tables()
     session_id = secrets.token_urlsafe(32)
     expires_at = datetime.now() + timedelta(days=SESSION_EXPIRY_DAYS)
 
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO sessions (id, user_id, expires_at) VALUES (?, ?, ?)",
-        (session_id, user_id, expires_at.isoformat()),
-    )
-    conn.commit()
-    conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO sessions (id, user_id, expires_at, expires_at_ts) VALUES (?, ?, ?, ?)",
+            (session_id, user_id, expires_at.isoformat(), int(expires_at.timestamp())),
+        )
+        conn.commit()
     return session_id
 
 
 def validate_session(session_id):
     """Validate a session ID. Returns user dict or None."""
-    _ensure_auth_tables()
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    cursor.execute(
-        """SELECT s.*, u.username FROM sessions s
-           JOIN users u ON s.user_id = u.id
-           WHERE s.id = ? AND s.expires_at > ?""",
-        (session_id, datetime.now().isoformat()),
-    )
-    row = cursor.fetchone()
-    conn.close()
+    with pooled_connection(read_only=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """SELECT u.id, u.username FROM sessions s
+               JOIN users u ON s.user_id = u.id
+               WHERE s.id = ? AND s.expires_at_ts > ?""",
+            (session_id, int(time.time())),
+        )
+        row = cursor.fetchone()
 
     if row is None:
         return None
 
-    return {"id": row["user_id"], "username": row["username"]}
+    return {"id": row["id"], "username": row["username"]}
 
 
 def delete_session(session_id):
     """Delete a session (logout)."""
-    _ensure_auth_tables()
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
-    conn.commit()
-    conn.close()
+    ensure_auth_tables()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        conn.commit()
 
 
 def cleanup_expired_sessions():
     """Purge expired session rows."""
-    _ensure_auth_tables()
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM sessions WHERE expires_at <= ?", (datetime.now().isoformat(),))
-    conn.commit()
-    conn.close()
+    ensure_auth_tables()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM sessions WHERE expires_at_ts <= ?", (int(time.time()),))
+        conn.commit()
 
 
 def get_or_create_secret_key():
     """Get or generate a persistent secret key stored in the settings table."""
-    from .settings import get_setting, set_setting, _ensure_settings_table
+    global _secret_key
+    if _secret_key:
+        return _secret_key
 
     key = get_setting("_secret_key")
-    if key:
-        return key
-
-    key = secrets.token_urlsafe(64)
-    set_setting("_secret_key", key)
+    if not key:
+        key = secrets.token_urlsafe(64)
+        set_setting("_secret_key", key)
+    _secret_key = key
     return key
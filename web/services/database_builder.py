@@ -6,12 +6,18 @@ import json
 from datetime import datetime
 
 from ..config import DATABASE_PATH
+from ..database import connect
 
 
-def create_database():
-    """Create the SQLite database with the games table."""
-    DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DATABASE_PATH)
+def create_database(conn=None):
+    """Create the SQLite database with the games table.
+
+    Uses the given connection if provided, otherwise opens (and closes) its own.
+    """
+    own_conn = conn is None
+    if own_conn:
+        DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = connect()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -102,79 +108,301 @@ def create_database():
     """)
 
     conn.commit()
-    return conn
+    if own_conn:
+        conn.close()
 
 
 def mark_removed_games(conn, store_name, seen_store_ids):
     """Mark games as removed if they were not seen during this sync.
 
-    Also restores previously-removed games that reappeared.
+    Also restores previously-removed games that reappeared, then commits,
+    so the importer's upserts and the removal flags land in one transaction.
     Returns (newly_removed_count, restored_count).
     """
     cursor = conn.cursor()
+    newly_removed = restored = 0
 
-    if not seen_store_ids:
-        return (0, 0)
+    if seen_store_ids:
+        placeholders = ",".join("?" * len(seen_store_ids))
+        seen_list = list(seen_store_ids)
 
-    placeholders = ",".join("?" * len(seen_store_ids))
-    seen_list = list(seen_store_ids)
-
-    # Mark games NOT in the seen set as removed
-    cursor.execute(
-        f"UPDATE games SET removed = 1 WHERE store = ? AND store_id NOT IN ({placeholders}) AND (removed IS NULL OR removed = 0)",
-        [store_name] + seen_list
-    )
-    newly_removed = cursor.rowcount
+        # Mark games NOT in the seen set as removed
+        cursor.execute(
+            f"UPDATE games SET removed = 1 WHERE store = ? AND store_id NOT IN ({placeholders}) AND (removed IS NULL OR removed = 0)",
+            [store_name] + seen_list
+        )
+        newly_removed = cursor.rowcount
 
-    # Restore games that reappeared
-    cursor.execute(
-        f"UPDATE games SET removed = 0 WHERE store = ? AND store_id IN ({placeholders}) AND removed = 1",
-        [store_name] + seen_list
-    )
-    restored = cursor.rowcount
+        # Restore games that reappeared
+        cursor.execute(
+            f"UPDATE games SET removed = 0 WHERE store = ? AND store_id IN ({placeholders}) AND removed = 1",
+            [store_name] + seen_list
+        )
+        restored = cursor.rowcount
 
     conn.commit()
     return (newly_removed, restored)
 
 
-def import_steam_games(conn):
-    """Import games from Steam."""
+# Base URL of Steam's per-app library artwork
+_STEAM_CDN_APPS_URL = "https://cdn.cloudflare.steamstatic.com/steam/apps"
+
+
+# Upserts used by the store importers, one per store
+_STEAM_UPSERT_SQL = """
+    INSERT INTO games (
+        name, store, store_id, cover_image, background_image, icon,
+        playtime_hours, critics_score, extra_data, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(store, store_id) DO UPDATE SET
+        name = excluded.name,
+        cover_image = excluded.cover_image,
+        background_image = excluded.background_image,
+        icon = excluded.icon,
+        playtime_hours = excluded.playtime_hours,
+        critics_score = excluded.critics_score,
+        extra_data = excluded.extra_data,
+        updated_at = excluded.updated_at
+"""
+_EPIC_UPSERT_SQL = """
+    INSERT INTO games (
+        name, store, store_id, description, developers,
+        supported_platforms, cover_image, release_date,
+        created_date, last_modified, can_run_offline,
+        dlcs, extra_data, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(store, store_id) DO UPDATE SET
+        name = excluded.name,
+        description = excluded.description,
+        developers = excluded.developers,
+        supported_platforms = excluded.supported_platforms,
+        cover_image = excluded.cover_image,
+        release_date = excluded.release_date,
+        created_date = excluded.created_date,
+        last_modified = excluded.last_modified,
+        can_run_offline = excluded.can_run_offline,
+        dlcs = excluded.dlcs,
+        extra_data = excluded.extra_data,
+        updated_at = excluded.updated_at
+"""
+_GOG_UPSERT_SQL = """
+    INSERT INTO games (
+        name, store, store_id, description, developers,
+        publishers, genres, cover_image, background_image,
+        icon, release_date, critics_score, extra_data, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(store, store_id) DO UPDATE SET
+        name = excluded.name,
+        description = excluded.description,
+        developers = excluded.developers,
+        publishers = excluded.publishers,
+        cover_image = excluded.cover_image,
+        background_image = excluded.background_image,
+        icon = excluded.icon,
+        release_date = excluded.release_date,
+        critics_score = excluded.critics_score,
+        extra_data = excluded.extra_data,
+        updated_at = excluded.updated_at
+"""
+# itch.io platform flags, in display order
+_ITCH_PLATFORMS = (
+    ("windows", "Windows"),
+    ("mac", "Mac"),
+    ("linux", "Linux"),
+    ("android", "Android"),
+)
+
+_ITCH_UPSERT_SQL = """
+    INSERT INTO games (
+        name, store, store_id, description, cover_image,
+        supported_platforms, release_date, extra_data, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(store, store_id) DO UPDATE SET
+        name = excluded.name,
+        description = excluded.description,
+        cover_image = excluded.cover_image,
+        supported_platforms = excluded.supported_platforms,
+        release_date = excluded.release_date,
+        extra_data = excluded.extra_data,
+        updated_at = excluded.updated_at
+"""
+_HUMBLE_UPSERT_SQL = """
+    INSERT INTO games (
+        name, store, store_id, cover_image, icon,
+        supported_platforms, publishers, release_date,
+        extra_data, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(store, store_id) DO UPDATE SET
+        name = excluded.name,
+        cover_image = excluded.cover_image,
+        icon = excluded.icon,
+        supported_platforms = excluded.supported_platforms,
+        publishers = excluded.publishers,
+        release_date = excluded.release_date,
+        extra_data = excluded.extra_data,
+        updated_at = excluded.updated_at
+"""
+_BATTLENET_UPSERT_SQL = """
+    INSERT INTO games (
+        name, store, store_id, cover_image,
+        extra_data, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(store, store_id) DO UPDATE SET
+        name = excluded.name,
+        cover_image = excluded.cover_image,
+        extra_data = excluded.extra_data,
+        updated_at = excluded.updated_at
+"""
+_EA_UPSERT_SQL = """
+    INSERT INTO games (
+        name, store, store_id, cover_image,
+        developers, publishers, release_date,
+        extra_data, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(store, store_id) DO UPDATE SET
+        name = excluded.name,
+        cover_image = excluded.cover_image,
+        developers = excluded.developers,
+        publishers = excluded.publishers,
+        release_date = excluded.release_date,
+        extra_data = excluded.extra_data,
+        updated_at = excluded.updated_at
+"""
+_AMAZON_UPSERT_SQL = """
+    INSERT INTO games (
+        name, store, store_id, cover_image, icon,
+        developers, publishers, extra_data, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(store, store_id) DO UPDATE SET
+        name = excluded.name,
+        cover_image = excluded.cover_image,
+        icon = excluded.icon,
+        developers = excluded.developers,
+        publishers = excluded.publishers,
+        extra_data = excluded.extra_data,
+        updated_at = excluded.updated_at
+"""
+_XBOX_UPSERT_SQL = """
+    INSERT INTO games (
+        name, store, store_id, cover_image,
+        developers, publishers, release_date,
+        extra_data, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(store, store_id) DO UPDATE SET
+        name = excluded.name,
+        cover_image = excluded.cover_image,
+        developers = excluded.developers,
+        publishers = excluded.publishers,
+        release_date = excluded.release_date,
+        extra_data = excluded.extra_data,
+        updated_at = excluded.updated_at
+"""
+_LOCAL_UPSERT_SQL = """
+    INSERT INTO games (
+        name, store, store_id, description, cover_image,
+        developers, genres, release_date, extra_data, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(store, store_id) DO UPDATE SET
+        name = excluded.name,
+        description = excluded.description,
+        cover_image = excluded.cover_image,
+        developers = excluded.developers,
+        genres = excluded.genres,
+        release_date = excluded.release_date,
+        extra_data = excluded.extra_data,
+        updated_at = excluded.updated_at
+"""
+
+
+def upsert_games(cursor, sql, rows):
+    """Upsert an importer's rows with a single executemany call.
+
+    If SQLite rejects a row (e.g. a game without a name), falls back to
+    row-at-a-time inserts so only the bad rows are skipped.
+    Returns the store IDs of the rows that were written.
+    """
+    try:
+        cursor.executemany(sql, rows)
+        return [row[2] for row in rows]
+    except sqlite3.Error:
+        pass
+
+    written = []
+    for row in rows:
+        try:
+            cursor.execute(sql, row)
+            written.append(row[2])
+        except sqlite3.Error as e:
+            print(f"  Error importing {row[0]}: {e}")
+    return written
+
+
+# Number of metadata sync results buffered before they are written together
+SYNC_WRITE_BATCH_SIZE = 25
+
+
+class BatchedWriter:
+    """Queue parameter rows for a metadata sync and write them in batches.
+
+    Workers only fetch; the sync loop queues each result here on its own
+    thread. Every batch_size rows, the queued rows for each statement are
+    written with executemany in one transaction instead of a commit per game.
+    Call flush() once more when the loop is done.
+    """
+
+    def __init__(self, conn, statements, batch_size=SYNC_WRITE_BATCH_SIZE):
+        self.conn = conn
+        self.batch_size = batch_size
+        # Written in the order given, one executemany per statement
+        self._pending = {sql: [] for sql in statements}
+        self._count = 0
+
+    def add(self, sql, params):
+        """Queue one row for sql, writing the batch once it is full."""
+        self._pending[sql].append(params)
+        self._count += 1
+        if self._count >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write all queued rows in one transaction."""
+        cursor = self.conn.cursor()
+        for sql, rows in self._pending.items():
+            if rows:
+                cursor.executemany(sql, rows)
+                rows.clear()
+        self._count = 0
+        self.conn.commit()
+
+
+def import_steam_games(conn, force=False):
+    """Import games from Steam (force re-fetches cached review scores)."""
     print("Importing Steam library...")
     cursor = conn.cursor()
 
     try:
         from ..sources.steam import get_steam_library
 
-        games = get_steam_library(fetch_reviews=True, max_workers=5)
+        games = get_steam_library(fetch_reviews=True, max_workers=5, ignore_cache=force)
         if not games:
             print("  No Steam games found or not authenticated")
             return 0
 
-        count = 0
-        seen_store_ids = set()
+        # One timestamp for the whole import
+        now = datetime.now().isoformat()
+        rows = []
         for game in games:
             try:
                 # Build cover image URL from appid
                 appid = game.get("appid")
-                store_id = str(appid) if appid else None
-                cover_image = f"https://cdn.cloudflare.steamstatic.com/steam/apps/{appid}/library_600x900_2x.jpg" if appid else None
-                background_image = f"https://cdn.cloudflare.steamstatic.com/steam/apps/{appid}/library_hero.jpg" if appid else None
-
-                cursor.execute("""
-                    INSERT INTO games (
-                        name, store, store_id, cover_image, background_image, icon,
-                        playtime_hours, critics_score, extra_data, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(store, store_id) DO UPDATE SET
-                        name = excluded.name,
-                        cover_image = excluded.cover_image,
-                        background_image = excluded.background_image,
-                        icon = excluded.icon,
-                        playtime_hours = excluded.playtime_hours,
-                        critics_score = excluded.critics_score,
-                        extra_data = excluded.extra_data,
-                        updated_at = excluded.updated_at
-                """, (
+                if appid:
+                    store_id = str(appid)
+                    cover_image = f"{_STEAM_CDN_APPS_URL}/{store_id}/library_600x900_2x.jpg"
+                    background_image = f"{_STEAM_CDN_APPS_URL}/{store_id}/library_hero.jpg"
+                else:
+                    store_id = cover_image = background_image = None
+
+                rows.append((
                     game.get("name"),
                     "steam",
                     store_id,
@@ -184,15 +412,14 @@ def import_steam_games(conn):
                     game.get("playtime_hours"),
                     game.get("review_score"),  # Steam user review percentage
                     json.dumps(game),
-                    datetime.now().isoformat()
+                    now
                 ))
-                if store_id:
-                    seen_store_ids.add(store_id)
-                count += 1
             except Exception as e:
                 print(f"  Error importing {game.get('name')}: {e}")
 
-        conn.commit()
+        written = upsert_games(cursor, _STEAM_UPSERT_SQL, rows)
+        count = len(written)
+        seen_store_ids = {str(store_id) for store_id in written if store_id}
         removed, restored = mark_removed_games(conn, "steam", seen_store_ids)
         if removed:
             print(f"  Marked {removed} Steam games as removed")
@@ -218,54 +445,36 @@ def import_epic_games(conn):
             print("  No Epic games found or not authenticated")
             return 0
 
-        count = 0
-        seen_store_ids = set()
+        # One timestamp for the whole import
+        now = datetime.now().isoformat()
+        rows = []
         for game in games:
             try:
                 store_id = game.get("app_name")
-                cursor.execute("""
-                    INSERT INTO games (
-                        name, store, store_id, description, developers,
-                        supported_platforms, cover_image, release_date,
-                        created_date, last_modified, can_run_offline,
-                        dlcs, extra_data, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(store, store_id) DO UPDATE SET
-                        name = excluded.name,
-                        description = excluded.description,
-                        developers = excluded.developers,
-                        supported_platforms = excluded.supported_platforms,
-                        cover_image = excluded.cover_image,
-                        release_date = excluded.release_date,
-                        created_date = excluded.created_date,
-                        last_modified = excluded.last_modified,
-                        can_run_offline = excluded.can_run_offline,
-                        dlcs = excluded.dlcs,
-                        extra_data = excluded.extra_data,
-                        updated_at = excluded.updated_at
-                """, (
+                developer = game.get("developer")
+                created_date = game.get("created_date")
+                rows.append((
                     game.get("name"),
                     "epic",
                     store_id,
                     game.get("description"),
-                    json.dumps([game.get("developer")]) if game.get("developer") else None,
+                    json.dumps([developer]) if developer else None,
                     json.dumps(game.get("supported_platforms", [])),
                     game.get("cover_image"),
-                    game.get("created_date"),
-                    game.get("created_date"),
+                    created_date,
+                    created_date,
                     game.get("last_modified"),
                     game.get("can_run_offline"),
                     json.dumps(game.get("dlcs", [])),
                     json.dumps(game),
-                    datetime.now().isoformat()
+                    now
                 ))
-                if store_id:
-                    seen_store_ids.add(store_id)
-                count += 1
             except Exception as e:
                 print(f"  Error importing {game.get('name')}: {e}")
 
-        conn.commit()
+        written = upsert_games(cursor, _EPIC_UPSERT_SQL, rows)
+        count = len(written)
+        seen_store_ids = {str(store_id) for store_id in written if store_id}
         removed, restored = mark_removed_games(conn, "epic", seen_store_ids)
         if removed:
             print(f"  Marked {removed} Epic games as removed")
@@ -291,8 +500,9 @@ def import_gog_games(conn):
             print("  No GOG games found or database not accessible")
             return 0
 
-        count = 0
-        seen_store_ids = set()
+        # One timestamp for the whole import
+        now = datetime.now().isoformat()
+        rows = []
         for game in games:
             try:
                 # Convert Unix timestamp to ISO date if present
@@ -311,30 +521,15 @@ def import_gog_games(conn):
                 seen = set()
                 combined_tags = []
                 for tag in genres + themes:
-                    if tag and tag.lower() not in seen:
-                        seen.add(tag.lower())
+                    if not tag:
+                        continue
+                    tag_lower = tag.lower()
+                    if tag_lower not in seen:
+                        seen.add(tag_lower)
                         combined_tags.append(tag)
 
                 store_id = game.get("product_id")
-                cursor.execute("""
-                    INSERT INTO games (
-                        name, store, store_id, description, developers,
-                        publishers, genres, cover_image, background_image,
-                        icon, release_date, critics_score, extra_data, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(store, store_id) DO UPDATE SET
-                        name = excluded.name,
-                        description = excluded.description,
-                        developers = excluded.developers,
-                        publishers = excluded.publishers,
-                        cover_image = excluded.cover_image,
-                        background_image = excluded.background_image,
-                        icon = excluded.icon,
-                        release_date = excluded.release_date,
-                        critics_score = excluded.critics_score,
-                        extra_data = excluded.extra_data,
-                        updated_at = excluded.updated_at
-                """, (
+                rows.append((
                     game.get("name"),
                     "gog",
                     store_id,
@@ -348,15 +543,14 @@ def import_gog_games(conn):
                     release_date,
                     game.get("critics_score"),
                     json.dumps(game),
-                    datetime.now().isoformat()
+                    now
                 ))
-                if store_id:
-                    seen_store_ids.add(str(store_id))
-                count += 1
             except Exception as e:
                 print(f"  Error importing {game.get('name')}: {e}")
 
-        conn.commit()
+        written = upsert_games(cursor, _GOG_UPSERT_SQL, rows)
+        count = len(written)
+        seen_store_ids = {str(store_id) for store_id in written if store_id}
         removed, restored = mark_removed_games(conn, "gog", seen_store_ids)
         if removed:
             print(f"  Marked {removed} GOG games as removed")
@@ -389,36 +583,17 @@ def import_itch_games(conn):
             print("  No itch.io games found")
             return 0
 
-        count = 0
-        seen_store_ids = set()
+        # One timestamp for the whole import
+        now = datetime.now().isoformat()
+        rows = []
         for game in games:
             try:
                 # Build platforms list
-                platforms = []
-                if game.get("platforms", {}).get("windows"):
-                    platforms.append("Windows")
-                if game.get("platforms", {}).get("mac"):
-                    platforms.append("Mac")
-                if game.get("platforms", {}).get("linux"):
-                    platforms.append("Linux")
-                if game.get("platforms", {}).get("android"):
-                    platforms.append("Android")
+                flags = game.get("platforms") or {}
+                platforms = [label for key, label in _ITCH_PLATFORMS if flags.get(key)]
 
                 store_id = str(game.get("id"))
-                cursor.execute("""
-                    INSERT INTO games (
-                        name, store, store_id, description, cover_image,
-                        supported_platforms, release_date, extra_data, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(store, store_id) DO UPDATE SET
-                        name = excluded.name,
-                        description = excluded.description,
-                        cover_image = excluded.cover_image,
-                        supported_platforms = excluded.supported_platforms,
-                        release_date = excluded.release_date,
-                        extra_data = excluded.extra_data,
-                        updated_at = excluded.updated_at
-                """, (
+                rows.append((
                     game.get("title"),
                     "itch",
                     store_id,
@@ -427,15 +602,14 @@ def import_itch_games(conn):
                     json.dumps(platforms) if platforms else None,
                     game.get("published_at"),
                     json.dumps(game),
-                    datetime.now().isoformat()
+                    now
                 ))
-                if store_id:
-                    seen_store_ids.add(store_id)
-                count += 1
             except Exception as e:
                 print(f"  Error importing {game.get('title')}: {e}")
 
-        conn.commit()
+        written = upsert_games(cursor, _ITCH_UPSERT_SQL, rows)
+        count = len(written)
+        seen_store_ids = {str(store_id) for store_id in written if store_id}
         removed, restored = mark_removed_games(conn, "itch", seen_store_ids)
         if removed:
             print(f"  Marked {removed} itch.io games as removed")
@@ -465,27 +639,13 @@ def import_humble_games(conn):
             print("  Set your Humble Bundle session cookie in Settings")
             return 0
 
-        count = 0
-        seen_store_ids = set()
+        # One timestamp for the whole import
+        now = datetime.now().isoformat()
+        rows = []
         for game in games:
             try:
                 store_id = game.get("machine_name")
-                cursor.execute("""
-                    INSERT INTO games (
-                        name, store, store_id, cover_image, icon,
-                        supported_platforms, publishers, release_date,
-                        extra_data, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(store, store_id) DO UPDATE SET
-                        name = excluded.name,
-                        cover_image = excluded.cover_image,
-                        icon = excluded.icon,
-                        supported_platforms = excluded.supported_platforms,
-                        publishers = excluded.publishers,
-                        release_date = excluded.release_date,
-                        extra_data = excluded.extra_data,
-                        updated_at = excluded.updated_at
-                """, (
+                rows.append((
                     game.get("human_name"),
                     "humble",
                     store_id,
@@ -495,15 +655,14 @@ def import_humble_games(conn):
                     json.dumps([game.get("payee")]) if game.get("payee") else None,
                     game.get("created"),
                     json.dumps(game),
-                    datetime.now().isoformat()
+                    now
                 ))
-                if store_id:
-                    seen_store_ids.add(store_id)
-                count += 1
             except Exception as e:
                 print(f"  Error importing {game.get('human_name')}: {e}")
 
-        conn.commit()
+        written = upsert_games(cursor, _HUMBLE_UPSERT_SQL, rows)
+        count = len(written)
+        seen_store_ids = {str(store_id) for store_id in written if store_id}
         removed, restored = mark_removed_games(conn, "humble", seen_store_ids)
         if removed:
             print(f"  Marked {removed} Humble Bundle games as removed")
@@ -533,36 +692,26 @@ def import_battlenet_games(conn):
             print("  Set your Battle.net session cookie in Settings")
             return 0
 
-        count = 0
-        seen_store_ids = set()
+        # One timestamp for the whole import
+        now = datetime.now().isoformat()
+        rows = []
         for game in games:
             try:
                 store_id = game.get("title_id")
-                cursor.execute("""
-                    INSERT INTO games (
-                        name, store, store_id, cover_image,
-                        extra_data, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(store, store_id) DO UPDATE SET
-                        name = excluded.name,
-                        cover_image = excluded.cover_image,
-                        extra_data = excluded.extra_data,
-                        updated_at = excluded.updated_at
-                """, (
+                rows.append((
                     game.get("name"),
                     "battlenet",
                     store_id,
                     game.get("cover_image"),
                     json.dumps(game.get("raw_data", {})),
-                    datetime.now().isoformat()
+                    now
                 ))
-                if store_id:
-                    seen_store_ids.add(str(store_id))
-                count += 1
             except Exception as e:
                 print(f"  Error importing {game.get('name')}: {e}")
 
-        conn.commit()
+        written = upsert_games(cursor, _BATTLENET_UPSERT_SQL, rows)
+        count = len(written)
+        seen_store_ids = {str(store_id) for store_id in written if store_id}
         removed, restored = mark_removed_games(conn, "battlenet", seen_store_ids)
         if removed:
             print(f"  Marked {removed} Battle.net games as removed")
@@ -592,8 +741,9 @@ def import_ea_games(conn):
             print("  Get a new EA bearer token using the script in Settings")
             return 0
 
-        count = 0
-        seen_store_ids = set()
+        # One timestamp for the whole import
+        now = datetime.now().isoformat()
+        rows = []
         for game in games:
             try:
                 # Build developers/publishers JSON arrays
@@ -601,21 +751,7 @@ def import_ea_games(conn):
                 publishers = [game.get("publisher")] if game.get("publisher") else None
 
                 store_id = game.get("offer_id")
-                cursor.execute("""
-                    INSERT INTO games (
-                        name, store, store_id, cover_image,
-                        developers, publishers, release_date,
-                        extra_data, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(store, store_id) DO UPDATE SET
-                        name = excluded.name,
-                        cover_image = excluded.cover_image,
-                        developers = excluded.developers,
-                        publishers = excluded.publishers,
-                        release_date = excluded.release_date,
-                        extra_data = excluded.extra_data,
-                        updated_at = excluded.updated_at
-                """, (
+                rows.append((
                     game.get("name"),
                     "ea",
                     store_id,
@@ -624,15 +760,14 @@ def import_ea_games(conn):
                     json.dumps(publishers) if publishers else None,
                     game.get("release_date"),
                     json.dumps(game.get("raw_data", {})),
-                    datetime.now().isoformat()
+                    now
                 ))
-                if store_id:
-                    seen_store_ids.add(store_id)
-                count += 1
             except Exception as e:
                 print(f"  Error importing {game.get('name')}: {e}")
 
-        conn.commit()
+        written = upsert_games(cursor, _EA_UPSERT_SQL, rows)
+        count = len(written)
+        seen_store_ids = {str(store_id) for store_id in written if store_id}
         removed, restored = mark_removed_games(conn, "ea", seen_store_ids)
         if removed:
             print(f"  Marked {removed} EA games as removed")
@@ -662,8 +797,9 @@ def import_amazon_games(conn):
             print("  Set up Amazon Games in Settings (local database or API token)")
             return 0
 
-        count = 0
-        seen_store_ids = set()
+        # One timestamp for the whole import
+        now = datetime.now().isoformat()
+        rows = []
         for game in games:
             try:
                 # Build developers/publishers JSON arrays
@@ -671,20 +807,7 @@ def import_amazon_games(conn):
                 publishers = [game.get("publisher")] if game.get("publisher") else None
 
                 store_id = game.get("product_id")
-                cursor.execute("""
-                    INSERT INTO games (
-                        name, store, store_id, cover_image, icon,
-                        developers, publishers, extra_data, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(store, store_id) DO UPDATE SET
-                        name = excluded.name,
-                        cover_image = excluded.cover_image,
-                        icon = excluded.icon,
-                        developers = excluded.developers,
-                        publishers = excluded.publishers,
-                        extra_data = excluded.extra_data,
-                        updated_at = excluded.updated_at
-                """, (
+                rows.append((
                     game.get("name"),
                     "amazon",
                     store_id,
@@ -693,15 +816,14 @@ def import_amazon_games(conn):
                     json.dumps(developers) if developers else None,
                     json.dumps(publishers) if publishers else None,
                     json.dumps(game.get("raw_data", {})),
-                    datetime.now().isoformat()
+                    now
                 ))
-                if store_id:
-                    seen_store_ids.add(store_id)
-                count += 1
             except Exception as e:
                 print(f"  Error importing {game.get('name')}: {e}")
 
-        conn.commit()
+        written = upsert_games(cursor, _AMAZON_UPSERT_SQL, rows)
+        count = len(written)
+        seen_store_ids = {str(store_id) for store_id in written if store_id}
         removed, restored = mark_removed_games(conn, "amazon", seen_store_ids)
         if removed:
             print(f"  Marked {removed} Amazon games as removed")
@@ -732,8 +854,9 @@ def import_xbox_games(conn):
             print("  Select Game Pass plan in Settings to import catalog")
             return 0
 
-        count = 0
-        seen_store_ids = set()
+        # One timestamp for the whole import
+        now = datetime.now().isoformat()
+        rows = []
         for game in games:
             try:
                 # Build developers/publishers JSON arrays
@@ -749,21 +872,7 @@ def import_xbox_games(conn):
                 }
 
                 store_id = game.get("store_id")
-                cursor.execute("""
-                    INSERT INTO games (
-                        name, store, store_id, cover_image,
-                        developers, publishers, release_date,
-                        extra_data, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(store, store_id) DO UPDATE SET
-                        name = excluded.name,
-                        cover_image = excluded.cover_image,
-                        developers = excluded.developers,
-                        publishers = excluded.publishers,
-                        release_date = excluded.release_date,
-                        extra_data = excluded.extra_data,
-                        updated_at = excluded.updated_at
-                """, (
+                rows.append((
                     game.get("name"),
                     "xbox",
                     store_id,
@@ -772,15 +881,14 @@ def import_xbox_games(conn):
                     json.dumps(publishers) if publishers else None,
                     game.get("release_date"),
                     json.dumps(extra_data),
-                    datetime.now().isoformat()
+                    now
                 ))
-                if store_id:
-                    seen_store_ids.add(store_id)
-                count += 1
             except Exception as e:
                 print(f"  Error importing {game.get('name')}: {e}")
 
-        conn.commit()
+        written = upsert_games(cursor, _XBOX_UPSERT_SQL, rows)
+        count = len(written)
+        seen_store_ids = {str(store_id) for store_id in written if store_id}
         removed, restored = mark_removed_games(conn, "xbox", seen_store_ids)
         if removed:
             print(f"  Marked {removed} Xbox games as removed")
@@ -810,8 +918,9 @@ def import_local_games(conn):
             print("  Set LOCAL_GAMES_PATHS in Settings (comma-separated folder paths)")
             return 0
 
-        count = 0
-        seen_store_ids = set()
+        # One timestamp for the whole import
+        now = datetime.now().isoformat()
+        rows = []
         for game in games:
             try:
                 # Build developers/genres JSON arrays if provided
@@ -826,21 +935,7 @@ def import_local_games(conn):
                     extra_data["manual_igdb_id"] = game.get("igdb_id")
 
                 store_id = game.get("store_id")
-                cursor.execute("""
-                    INSERT INTO games (
-                        name, store, store_id, description, cover_image,
-                        developers, genres, release_date, extra_data, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(store, store_id) DO UPDATE SET
-                        name = excluded.name,
-                        description = excluded.description,
-                        cover_image = excluded.cover_image,
-                        developers = excluded.developers,
-                        genres = excluded.genres,
-                        release_date = excluded.release_date,
-                        extra_data = excluded.extra_data,
-                        updated_at = excluded.updated_at
-                """, (
+                rows.append((
                     game.get("name"),
                     "local",
                     store_id,
@@ -850,15 +945,14 @@ def import_local_games(conn):
                     json.dumps(genres) if genres else None,
                     game.get("release_date"),
                     json.dumps(extra_data),
-                    datetime.now().isoformat()
+                    now
                 ))
-                if store_id:
-                    seen_store_ids.add(store_id)
-                count += 1
             except Exception as e:
                 print(f"  Error importing {game.get('name')}: {e}")
 
-        conn.commit()
+        written = upsert_games(cursor, _LOCAL_UPSERT_SQL, rows)
+        count = len(written)
+        seen_store_ids = {str(store_id) for store_id in written if store_id}
         removed, restored = mark_removed_games(conn, "local", seen_store_ids)
         if removed:
             print(f"  Marked {removed} local games as removed")
@@ -874,16 +968,49 @@ def import_local_games(conn):
         return 0
 
 
-def add_average_rating_column(conn):
-    """Add average_rating column to the database if it doesn't exist."""
+# Column lists already ensured on the games table in this process. The metadata
+# syncs and update_average_rating() call these on every run or rating edit, so
+# the PRAGMA table_info probe is done only once per list.
+_ensured_games_columns = set()
+
+
+def ensure_games_columns(conn, columns, indexes=()):
+    """Add any of columns missing from the games table, once per process.
+
+    columns is a sequence of (name, type) pairs. The missing ones are added
+    in a single transaction, together with the CREATE INDEX IF NOT EXISTS
+    statements in indexes.
+    """
+    key = (tuple(columns), tuple(indexes))
+    if key in _ensured_games_columns:
+        return
+
     cursor = conn.cursor()
     cursor.execute("PRAGMA table_info(games)")
     existing_columns = {row[1] for row in cursor.fetchall()}
 
-    if "average_rating" not in existing_columns:
-        cursor.execute("ALTER TABLE games ADD COLUMN average_rating REAL")
-        print("Added column: average_rating")
-        conn.commit()
+    missing_columns = [
+        (col_name, col_type) for col_name, col_type in columns
+        if col_name not in existing_columns
+    ]
+
+    # sqlite3 runs each ALTER TABLE in its own implicit transaction; add them
+    # all in one instead
+    if (missing_columns or indexes) and not conn.in_transaction:
+        cursor.execute("BEGIN")
+    for col_name, col_type in missing_columns:
+        cursor.execute(f"ALTER TABLE games ADD COLUMN {col_name} {col_type}")
+        print(f"Added column: {col_name}")
+    for sql in indexes:
+        cursor.execute(sql)
+
+    conn.commit()
+    _ensured_games_columns.add(key)
+
+
+def add_average_rating_column(conn):
+    """Add average_rating column to the database if it doesn't exist."""
+    ensure_games_columns(conn, [("average_rating", "REAL")])
 
 
 def calculate_average_rating(
@@ -930,7 +1057,8 @@ def calculate_average_rating(
 def update_average_rating(conn, game_id):
     """
     Fetch all ratings for a game and update its average_rating.
-    Call this after updating any rating field for a game.
+    Call this after updating any rating field for a game; it commits, so the
+    rating update and the new average land in one transaction.
     """
     cursor = conn.cursor()
 
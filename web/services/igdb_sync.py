@@ -2,12 +2,16 @@
 # Matches games in our database to IGDB entries and fetches ratings/metadata
 
 import sqlite3
+import orjson
 import requests
 import time
 import json
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 
+from .database_builder import BatchedWriter, ensure_games_columns
 from .settings import get_igdb_credentials, get_setting, IGDB_MATCH_THRESHOLD
 
 # IGDB API endpoints
@@ -23,13 +27,42 @@ POPULARITY_TYPE_STEAM_PEAK_24H = 5
 POPULARITY_TYPE_STEAM_POSITIVE_REVIEWS = 6
 
 
+# Common suffixes/prefixes that hurt search matching, removed in this order
+_NAME_CLEANUP_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r"\s*\(.*?\)",  # Remove parenthetical content
+        r"\s*-\s*Demo$",
+        r"\s*Demo$",
+        r"\s*\[.*?\]",  # Remove bracketed content
+        r"[™®©]",
+    )
+]
+
+
+# Waits between retries of a rate-limited (429) IGDB request, unless the
+# response gives a Retry-After; the request fails after the last one
+_RATE_LIMIT_BACKOFF_SECONDS = (1, 2, 4, 8)
+
+
 class IGDBClient:
-    def __init__(self):
+    def __init__(self, min_request_interval=0.25):
         self.access_token = None
         self.token_expires_at = 0
+        # IGDB allows 4 requests/second; a token bucket shared by all sync
+        # worker threads, refilled at one token per min_request_interval
+        self.min_request_interval = min_request_interval
+        self._bucket_capacity = max(1.0, 1.0 / min_request_interval)
+        self._tokens = self._bucket_capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self._token_lock = threading.Lock()
         creds = get_igdb_credentials()
         self.client_id = creds.get("client_id")
         self.client_secret = creds.get("client_secret")
+        # One keep-alive session for the whole sync instead of a new TCP+TLS
+        # handshake per request
+        self.session = requests.Session()
+        self.session.headers.update({"Client-ID": self.client_id or ""})
         self._get_access_token()
 
     def _get_access_token(self):
@@ -39,7 +72,7 @@ class IGDBClient:
                 "IGDB credentials not configured. Please set them in Settings."
             )
 
-        response = requests.post(
+        response = self.session.post(
             TWITCH_TOKEN_URL,
             data={
                 "client_id": self.client_id,
@@ -59,34 +92,55 @@ class IGDBClient:
 
     def _ensure_token(self):
         """Ensure we have a valid access token."""
-        if time.time() >= self.token_expires_at:
-            self._get_access_token()
+        with self._token_lock:
+            if time.time() >= self.token_expires_at:
+                self._get_access_token()
+
+    def _rate_limit(self):
+        """Ensure we don't make requests too quickly (thread-safe)."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._bucket_capacity,
+                    self._tokens + (now - self._last_refill) / self.min_request_interval,
+                )
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * self.min_request_interval
+            # Sleep outside the lock so other workers aren't queued behind it
+            time.sleep(wait)
 
     def _request(self, endpoint, body):
-        """Make a request to the IGDB API."""
-        self._ensure_token()
-
-        response = requests.post(
-            f"{IGDB_API_URL}/{endpoint}",
-            headers={
-                "Client-ID": self.client_id,
-                "Authorization": f"Bearer {self.access_token}",
-            },
-            data=body,
-        )
+        """Make a request to the IGDB API (429 responses are retried with backoff)."""
+        for backoff in _RATE_LIMIT_BACKOFF_SECONDS + (None,):
+            self._ensure_token()
+            self._rate_limit()
+
+            response = self.session.post(
+                f"{IGDB_API_URL}/{endpoint}",
+                headers={"Authorization": f"Bearer {self.access_token}"},
+                data=body,
+            )
+
+            if response.status_code != 429 or backoff is None:
+                break
 
-        if response.status_code == 429:
             # Rate limited - wait and retry
-            retry_after = int(response.headers.get("Retry-After", 1))
+            try:
+                retry_after = float(response.headers.get("Retry-After", backoff))
+            except ValueError:
+                retry_after = backoff
             print(f"Rate limited, waiting {retry_after}s...")
             time.sleep(retry_after)
-            return self._request(endpoint, body)
 
         if response.status_code != 200:
             print(f"IGDB API error: {response.status_code} - {response.text}")
             return None
 
-        return response.json()
+        return orjson.loads(response.content)
 
     def search_game(self, name):
         """Search for a game by name."""
@@ -225,32 +279,15 @@ class IGDBClient:
         if not name:
             return ""
 
-        # Remove common suffixes/prefixes that hurt matching
-        patterns_to_remove = [
-            r"\s*\(.*?\)",  # Remove parenthetical content
-            r"\s*-\s*Demo$",
-            r"\s*Demo$",
-            r"\s*\[.*?\]",  # Remove bracketed content
-            r"™",
-            r"®",
-            r"©",
-        ]
-
         clean = name
-        for pattern in patterns_to_remove:
-            clean = re.sub(pattern, "", clean, flags=re.IGNORECASE)
+        for pattern in _NAME_CLEANUP_PATTERNS:
+            clean = pattern.sub("", clean)
 
         return clean.strip()
 
 
 def add_igdb_columns(conn):
     """Add IGDB-related columns to the database if they don't exist."""
-    cursor = conn.cursor()
-
-    # Check existing columns
-    cursor.execute("PRAGMA table_info(games)")
-    existing_columns = {row[1] for row in cursor.fetchall()}
-
     new_columns = [
         ("igdb_id", "INTEGER"),
         ("igdb_slug", "TEXT"),
@@ -269,12 +306,11 @@ def add_igdb_columns(conn):
         ("igdb_release_date", "INTEGER"),  # IGDB first_release_date as Unix timestamp
     ]
 
-    for col_name, col_type in new_columns:
-        if col_name not in existing_columns:
-            cursor.execute(f"ALTER TABLE games ADD COLUMN {col_name} {col_type}")
-            print(f"Added column: {col_name}")
-
-    conn.commit()
+    # Partial index over the not-yet-matched games, so an incremental sync
+    # reads its work list in name order without scanning the whole library
+    ensure_games_columns(conn, new_columns, indexes=(
+        "CREATE INDEX IF NOT EXISTS idx_games_igdb_pending ON games(name) WHERE igdb_id IS NULL",
+    ))
 
 
 def extract_genres_and_themes(igdb_data):
@@ -327,10 +363,11 @@ def merge_and_dedupe_genres(existing_genres_json, new_genres):
     for genre in existing + new_genres:
         if not genre:
             continue
-        genre_lower = genre.lower().strip()
+        genre = genre.strip()
+        genre_lower = genre.lower()
         if genre_lower not in seen:
             seen.add(genre_lower)
-            merged.append(genre.strip())
+            merged.append(genre)
 
     return json.dumps(merged) if merged else None
 
@@ -385,134 +422,162 @@ def calculate_match_score(game_name, igdb_result, game_release_year=None):
     return score
 
 
-def sync_games(conn, client, limit=None, force=False, progress_callback=None):
-    """Sync games with IGDB.
+def _process_single_game(client, name, release_date, min_match_score):
+    """
+    Search IGDB for a single game and pick the best match.
+    Returns a tuple of (best_match or None, best_score).
+    """
+    # Parse release year from store's release_date (ISO format string)
+    game_release_year = None
+    if release_date:
+        try:
+            game_release_year = int(str(release_date)[:4])
+        except (ValueError, IndexError):
+            pass
+
+    results = client.search_game(name)
+    if not results:
+        return (None, None)
+
+    # Find best match
+    best_match = None
+    best_score = 0
+
+    for result in results:
+        score = calculate_match_score(name, result, game_release_year)
+        if score > best_score:
+            best_score = score
+            best_match = result
+
+    if best_match and best_score >= min_match_score:
+        return (best_match, best_score)
+    return (None, best_score)
+
+
+# Statements used to write IGDB sync results
+_UPDATE_IGDB_SQL = """
+    UPDATE games SET
+        igdb_id = ?,
+        igdb_slug = ?,
+        igdb_rating = ?,
+        igdb_rating_count = ?,
+        aggregated_rating = ?,
+        aggregated_rating_count = ?,
+        total_rating = ?,
+        total_rating_count = ?,
+        igdb_summary = ?,
+        igdb_cover_url = ?,
+        igdb_screenshots = ?,
+        igdb_matched_at = CURRENT_TIMESTAMP,
+        nsfw = ?,
+        genres = ?,
+        steam_app_id = ?,
+        igdb_release_date = ?
+    WHERE id = ?
+"""
+
+_MARK_IGDB_NOT_FOUND_SQL = """
+    UPDATE games SET igdb_id = 0, igdb_matched_at = CURRENT_TIMESTAMP WHERE id = ?
+"""
+
+
+def sync_games(conn, client, limit=None, force=False, max_workers=4, progress_callback=None):
+    """Sync games with IGDB using multithreading.
+
+    Searches run in parallel (the client enforces IGDB's rate limit across
+    threads); database updates stay on the calling thread.
 
     Args:
         conn: Database connection
         client: IGDBClient instance
         limit: Maximum number of games to process
         force: If True, resync all games; if False, only sync unmatched games
+        max_workers: Number of parallel workers
         progress_callback: Optional callback function(current, total, message) for progress updates
     """
     cursor = conn.cursor()
 
     # Get games that haven't been matched yet (or all if force)
     # Also fetch existing genres to merge with IGDB data
+    # The limit is applied in SQL (a negative LIMIT means no limit) so rows
+    # past it are never fetched
     if force:
         cursor.execute(
-            "SELECT id, name, store, genres, release_date FROM games WHERE name IS NOT NULL ORDER BY name"
+            "SELECT id, name, genres, release_date FROM games WHERE name IS NOT NULL ORDER BY name LIMIT ?",
+            (limit or -1,),
         )
     else:
         cursor.execute(
-            """SELECT id, name, store, genres, release_date FROM games
+            """SELECT id, name, genres, release_date FROM games
                WHERE name IS NOT NULL AND igdb_id IS NULL
-               ORDER BY name"""
+               ORDER BY name
+               LIMIT ?""",
+            (limit or -1,),
         )
 
     games = cursor.fetchall()
 
-    if limit:
-        games = games[:limit]
-
     total = len(games)
-    print(f"Processing {total} games...")
+    print(f"Processing {total} games with {max_workers} workers...")
 
+    min_match_score = int(get_setting(IGDB_MATCH_THRESHOLD, "50"))
     matched = 0
     failed = 0
+    completed = 0
 
-    for i, (game_id, name, store, existing_genres, release_date) in enumerate(games):
-        print(f"[{i+1}/{total}] Searching for: {name}...", end=" ", flush=True)
+    writer = BatchedWriter(conn, (_UPDATE_IGDB_SQL, _MARK_IGDB_NOT_FOUND_SQL))
 
-        # Parse release year from store's release_date (ISO format string)
-        game_release_year = None
-        if release_date:
-            try:
-                game_release_year = int(str(release_date)[:4])
-            except (ValueError, IndexError):
-                pass
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        future_to_game = {
+            executor.submit(_process_single_game, client, name, release_date, min_match_score): (
+                game_id, name, existing_genres
+            )
+            for game_id, name, existing_genres, release_date in games
+        }
 
-        # Report progress
-        if progress_callback:
-            progress_callback(i + 1, total, f"Processing: {name[:50]}...")
+        for future in as_completed(future_to_game):
+            game_id, name, existing_genres = future_to_game[future]
+            completed += 1
 
-        try:
-            results = client.search_game(name)
-
-            if not results:
-                print("No results")
-                # Mark as searched but not found (igdb_id = 0)
-                cursor.execute(
-                    "UPDATE games SET igdb_id = 0, igdb_matched_at = CURRENT_TIMESTAMP WHERE id = ?",
-                    (game_id,)
-                )
-                conn.commit()
-                failed += 1
-                continue
+            # Report progress
+            if progress_callback:
+                progress_callback(completed, total, f"Processing: {name[:50]}...")
 
-            # Find best match
-            best_match = None
-            best_score = 0
-
-            for result in results:
-                score = calculate_match_score(name, result, game_release_year)
-                if score > best_score:
-                    best_score = score
-                    best_match = result
-
-            min_match_score = int(get_setting(IGDB_MATCH_THRESHOLD, "50"))
-            if best_match and best_score >= min_match_score:
-                # Extract cover URL (IGDB returns thumbnail, we want bigger)
-                cover_url = None
-                if best_match.get("cover"):
-                    cover_url = best_match["cover"].get("url", "")
-                    # Convert to larger image
-                    cover_url = cover_url.replace("t_thumb", "t_cover_big")
-                    if cover_url and not cover_url.startswith("http"):
-                        cover_url = "https:" + cover_url
-
-                # Extract up to 5 screenshot URLs
-                screenshots = []
-                if best_match.get("screenshots"):
-                    for screenshot in best_match["screenshots"][:5]:
-                        url = screenshot.get("url", "")
-                        # Convert to larger image (screenshot_big = 889x500)
-                        url = url.replace("t_thumb", "t_screenshot_big")
-                        if url and not url.startswith("http"):
-                            url = "https:" + url
-                        screenshots.append(url)
-
-                # Check if game is NSFW
-                is_nsfw = IGDBClient.is_nsfw(best_match)
-
-                # Extract Steam App ID from IGDB external_games
-                steam_app_id = IGDBClient.extract_steam_app_id(best_match)
-
-                # Extract genres and themes from IGDB and merge with existing
-                igdb_tags = extract_genres_and_themes(best_match)
-                merged_genres = merge_and_dedupe_genres(existing_genres, igdb_tags)
-
-                # Update database
-                cursor.execute(
-                    """UPDATE games SET
-                        igdb_id = ?,
-                        igdb_slug = ?,
-                        igdb_rating = ?,
-                        igdb_rating_count = ?,
-                        aggregated_rating = ?,
-                        aggregated_rating_count = ?,
-                        total_rating = ?,
-                        total_rating_count = ?,
-                        igdb_summary = ?,
-                        igdb_cover_url = ?,
-                        igdb_screenshots = ?,
-                        igdb_matched_at = CURRENT_TIMESTAMP,
-                        nsfw = ?,
-                        genres = ?,
-                        steam_app_id = ?,
-                        igdb_release_date = ?
-                    WHERE id = ?""",
-                    (
+            try:
+                best_match, best_score = future.result()
+
+                if best_match:
+                    # Extract cover URL (IGDB returns thumbnail, we want bigger)
+                    cover_url = None
+                    if best_match.get("cover"):
+                        cover_url = best_match["cover"].get("url", "")
+                        # Convert to larger image
+                        cover_url = cover_url.replace("t_thumb", "t_cover_big")
+                        if cover_url and not cover_url.startswith("http"):
+                            cover_url = "https:" + cover_url
+
+                    # Extract up to 5 screenshot URLs
+                    screenshots = []
+                    if best_match.get("screenshots"):
+                        for screenshot in best_match["screenshots"][:5]:
+                            url = screenshot.get("url", "")
+                            # Convert to larger image (screenshot_big = 889x500)
+                            url = url.replace("t_thumb", "t_screenshot_big")
+                            if url and not url.startswith("http"):
+                                url = "https:" + url
+                            screenshots.append(url)
+
+                    # Check if game is NSFW
+                    is_nsfw = IGDBClient.is_nsfw(best_match)
+
+                    # Extract Steam App ID from IGDB external_games
+                    steam_app_id = IGDBClient.extract_steam_app_id(best_match)
+
+                    # Extract genres and themes from IGDB and merge with existing
+                    igdb_tags = extract_genres_and_themes(best_match)
+                    merged_genres = merge_and_dedupe_genres(existing_genres, igdb_tags)
+
+                    writer.add(_UPDATE_IGDB_SQL, (
                         best_match.get("id"),
                         best_match.get("slug"),
                         best_match.get("rating"),
@@ -529,32 +594,28 @@ def sync_games(conn, client, limit=None, force=False, progress_callback=None):
                         steam_app_id,
                         best_match.get("first_release_date"),
                         game_id,
-                    ),
-                )
-                conn.commit()
-
-                rating_str = ""
-                if best_match.get("total_rating"):
-                    rating_str = f" (Rating: {best_match['total_rating']:.1f})"
-
-                print(f"Matched: {best_match['name']} (score: {best_score:.0f}){rating_str}")
-                matched += 1
-            else:
-                print(f"No good match (best score: {best_score:.0f})")
-                # Mark as searched but not found (igdb_id = 0)
-                cursor.execute(
-                    "UPDATE games SET igdb_id = 0, igdb_matched_at = CURRENT_TIMESTAMP WHERE id = ?",
-                    (game_id,)
-                )
-                conn.commit()
+                    ))
+
+                    rating_str = ""
+                    if best_match.get("total_rating"):
+                        rating_str = f" (Rating: {best_match['total_rating']:.1f})"
+
+                    print(f"[{completed}/{total}] {name} → Matched: {best_match['name']} (score: {best_score:.0f}){rating_str}")
+                    matched += 1
+                else:
+                    if best_score is None:
+                        print(f"[{completed}/{total}] {name} → No results")
+                    else:
+                        print(f"[{completed}/{total}] {name} → No good match (best score: {best_score:.0f})")
+                    # Mark as searched but not found (igdb_id = 0)
+                    writer.add(_MARK_IGDB_NOT_FOUND_SQL, (game_id,))
+                    failed += 1
+
+            except Exception as e:
+                print(f"[{completed}/{total}] {name} → Error: {e}")
                 failed += 1
 
-            # Rate limiting - IGDB allows 4 requests/second
-            time.sleep(0.3)
-
-        except Exception as e:
-            print(f"Error: {e}")
-            failed += 1
+    writer.flush()
 
     return matched, failed
 
@@ -1,14 +1,20 @@
 # services/jobs.py
 # Job management service for tracking background sync operations
 
-import sqlite3
+import json
 import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from enum import Enum
-from typing import Callable, Optional
+from typing import Callable, Optional, Union
 
-from ..config import DATABASE_PATH
+from ..database import pooled_connection
+
+
+# Encodes job results stored in the jobs table
+_json_encode = json.JSONEncoder().encode
 
 
 class JobStatus(str, Enum):
@@ -25,111 +31,203 @@ class JobType(str, Enum):
     PROTONDB_SYNC = "protondb_sync"
 
 
+# Set once the jobs table is known to exist in this process. It is created at
+# startup, so the job functions (polled by the UI) don't call
+# ensure_jobs_table() at all.
+_jobs_table_ready = False
+
+
 def ensure_jobs_table():
-    """Create jobs table if it doesn't exist."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS jobs (
-            id TEXT PRIMARY KEY,
-            type TEXT NOT NULL,
-            status TEXT NOT NULL DEFAULT 'pending',
-            progress INTEGER DEFAULT 0,
-            total INTEGER DEFAULT 0,
-            message TEXT,
-            result TEXT,
-            error TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            completed_at TIMESTAMP
-        )
-    """)
-
-    conn.commit()
-    conn.close()
+    """Create jobs table if it doesn't exist (once per process)."""
+    global _jobs_table_ready
+    if _jobs_table_ready:
+        return
+
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                type TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                progress INTEGER DEFAULT 0,
+                total INTEGER DEFAULT 0,
+                message TEXT,
+                result TEXT,
+                error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                completed_at TIMESTAMP
+            )
+        """)
+
+        # For the active-job lookups polled by the UI
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at DESC)
+        """)
+
+        conn.commit()
+    _jobs_table_ready = True
+
+
+# IDs of jobs created by this process that haven't completed or failed yet.
+# Jobs only run in-process (orphans are failed at startup), so when this is
+# empty there is nothing pending or running to look up.
+_active_job_ids: set[str] = set()
+_active_jobs_lock = threading.Lock()
 
 
 def create_job(job_type: JobType, message: str = "") -> str:
     """Create a new job and return its ID."""
-    ensure_jobs_table()
-
     job_id = str(uuid.uuid4())[:8]
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
+    with _active_jobs_lock:
+        _active_job_ids.add(job_id)
+    now = datetime.now().isoformat()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        INSERT INTO jobs (id, type, status, message, created_at, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (job_id, job_type.value, JobStatus.PENDING.value, message,
-          datetime.now().isoformat(), datetime.now().isoformat()))
+        cursor.execute("""
+            INSERT INTO jobs (id, type, status, message, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (job_id, job_type.value, JobStatus.PENDING.value, message, now, now))
 
-    conn.commit()
-    conn.close()
+        conn.commit()
 
     return job_id
 
 
-def update_job_progress(job_id: str, progress: int, total: int, message: str = ""):
-    """Update job progress."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        UPDATE jobs
-        SET progress = ?, total = ?, message = ?, status = ?, updated_at = ?
-        WHERE id = ?
-    """, (progress, total, message, JobStatus.RUNNING.value,
-          datetime.now().isoformat(), job_id))
-
-    conn.commit()
-    conn.close()
-
-
-def complete_job(job_id: str, result: str, message: str = ""):
-    """Mark job as completed."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        UPDATE jobs
-        SET status = ?, result = ?, message = ?, progress = total,
-            updated_at = ?, completed_at = ?
-        WHERE id = ?
-    """, (JobStatus.COMPLETED.value, result, message,
-          datetime.now().isoformat(), datetime.now().isoformat(), job_id))
-
-    conn.commit()
-    conn.close()
+# Minimum seconds between progress writes for one job. Sync loops report
+# progress per item; intermediate values in between are coalesced.
+PROGRESS_UPDATE_INTERVAL = 0.5
+_progress_lock = threading.Lock()
+_last_progress_write: dict[str, float] = {}
+# Latest progress per job that was coalesced away and not yet written
+_pending_progress: dict[str, tuple] = {}
+
+
+# Statements run on every progress tick / UI poll. Pooled connections keep
+# their sqlite3 statement cache, so reusing the same SQL text skips re-preparing.
+_UPDATE_PROGRESS_SQL = """
+    UPDATE jobs
+    SET progress = ?, total = ?, message = ?, status = ?, updated_at = ?
+    WHERE id = ?
+"""
+_SELECT_JOB_SQL = "SELECT * FROM jobs WHERE id = ?"
+_SELECT_ACTIVE_JOBS_SQL = """
+    SELECT * FROM jobs
+    WHERE status IN (?, ?)
+    ORDER BY created_at DESC
+"""
+
+
+def _write_job_progress(job_id: str, progress: int, total: int, message: str):
+    """Write a progress update to the jobs table."""
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(_UPDATE_PROGRESS_SQL, (progress, total, message, JobStatus.RUNNING.value,
+              datetime.now().isoformat(), job_id))
+
+        conn.commit()
+
+
+def _forget_progress(job_id: str) -> Optional[tuple]:
+    """Drop a finished job's tracking, returning any unwritten progress update."""
+    with _active_jobs_lock:
+        _active_job_ids.discard(job_id)
+    with _progress_lock:
+        _last_progress_write.pop(job_id, None)
+        return _pending_progress.pop(job_id, None)
+
+
+def update_job_progress(job_id: str, progress: int, total: int, message: str = "",
+                        force: bool = False):
+    """Update job progress.
+
+    Writes at most one update per PROGRESS_UPDATE_INTERVAL for each job; the
+    first and final (progress == total) updates are always written, as are
+    forced ones.
+    """
+    now = time.monotonic()
+    with _progress_lock:
+        last_write = _last_progress_write.get(job_id)
+        if (not force and progress < total and last_write is not None
+                and now - last_write < PROGRESS_UPDATE_INTERVAL):
+            _pending_progress[job_id] = (progress, total, message)
+            return
+        _last_progress_write[job_id] = now
+        _pending_progress.pop(job_id, None)
+
+    _write_job_progress(job_id, progress, total, message)
+
+
+def _flush_due_progress():
+    """Write coalesced progress updates whose interval has passed.
+
+    Called from the UI's polling reads, so a job that goes quiet after a
+    coalesced update (e.g. a long final phase) still shows its latest progress.
+    The lock is held while writing so a newer update can't be overwritten.
+    """
+    with _progress_lock:
+        if not _pending_progress:
+            return
+        now = time.monotonic()
+        due = [
+            job_id for job_id in _pending_progress
+            if now - _last_progress_write.get(job_id, 0) >= PROGRESS_UPDATE_INTERVAL
+        ]
+        for job_id in due:
+            _last_progress_write[job_id] = now
+            _write_job_progress(job_id, *_pending_progress.pop(job_id))
+
+
+def complete_job(job_id: str, result: Union[dict, str], message: str = ""):
+    """Mark job as completed. A dict result is JSON-encoded for storage."""
+    if not isinstance(result, str):
+        result = _json_encode(result)
+    _forget_progress(job_id)
+    now = datetime.now().isoformat()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            UPDATE jobs
+            SET status = ?, result = ?, message = ?, progress = total,
+                updated_at = ?, completed_at = ?
+            WHERE id = ?
+        """, (JobStatus.COMPLETED.value, result, message, now, now, job_id))
+
+        conn.commit()
 
 
 def fail_job(job_id: str, error: str):
     """Mark job as failed."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
+    # Keep the last reported progress so the failure shows how far it got
+    pending = _forget_progress(job_id)
+    if pending:
+        _write_job_progress(job_id, *pending)
+    now = datetime.now().isoformat()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        UPDATE jobs
-        SET status = ?, error = ?, updated_at = ?, completed_at = ?
-        WHERE id = ?
-    """, (JobStatus.FAILED.value, error,
-          datetime.now().isoformat(), datetime.now().isoformat(), job_id))
+        cursor.execute("""
+            UPDATE jobs
+            SET status = ?, error = ?, updated_at = ?, completed_at = ?
+            WHERE id = ?
+        """, (JobStatus.FAILED.value, error, now, now, job_id))
 
-    conn.commit()
-    conn.close()
+        conn.commit()
 
 
 def get_job(job_id: str) -> Optional[dict]:
     """Get job by ID."""
-    ensure_jobs_table()
+    _flush_due_progress()
+    with pooled_connection(read_only=True) as conn:
+        cursor = conn.cursor()
 
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
-    row = cursor.fetchone()
-    conn.close()
+        cursor.execute(_SELECT_JOB_SQL, (job_id,))
+        row = cursor.fetchone()
 
     if row:
         return dict(row)
@@ -138,104 +236,92 @@ def get_job(job_id: str) -> Optional[dict]:
 
 def get_active_jobs() -> list:
     """Get all pending or running jobs."""
-    ensure_jobs_table()
+    with _active_jobs_lock:
+        if not _active_job_ids:
+            return []
 
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    _flush_due_progress()
+    with pooled_connection(read_only=True) as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT * FROM jobs
-        WHERE status IN (?, ?)
-        ORDER BY created_at DESC
-    """, (JobStatus.PENDING.value, JobStatus.RUNNING.value))
+        cursor.execute(_SELECT_ACTIVE_JOBS_SQL, (JobStatus.PENDING.value, JobStatus.RUNNING.value))
 
-    rows = cursor.fetchall()
-    conn.close()
+        rows = cursor.fetchall()
 
     return [dict(row) for row in rows]
 
 
 def get_recent_jobs(limit: int = 10) -> list:
     """Get recent jobs including completed ones."""
-    ensure_jobs_table()
-
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    with pooled_connection(read_only=True) as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT * FROM jobs
-        ORDER BY created_at DESC
-        LIMIT ?
-    """, (limit,))
+        cursor.execute("""
+            SELECT * FROM jobs
+            ORDER BY created_at DESC
+            LIMIT ?
+        """, (limit,))
 
-    rows = cursor.fetchall()
-    conn.close()
+        rows = cursor.fetchall()
 
     return [dict(row) for row in rows]
 
 
 def cleanup_old_jobs(hours: int = 24):
     """Remove completed/failed jobs older than specified hours."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute("""
-        DELETE FROM jobs
-        WHERE status IN (?, ?)
-        AND completed_at < datetime('now', ?)
-    """, (JobStatus.COMPLETED.value, JobStatus.FAILED.value, f'-{hours} hours'))
+        cursor.execute("""
+            DELETE FROM jobs
+            WHERE status IN (?, ?)
+            AND completed_at < datetime('now', ?)
+        """, (JobStatus.COMPLETED.value, JobStatus.FAILED.value, f'-{hours} hours'))
 
-    conn.commit()
-    conn.close()
+        conn.commit()
 
 
 def cleanup_orphaned_jobs():
     """Mark any running/pending jobs as failed (called on server startup)."""
-    ensure_jobs_table()
-
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        UPDATE jobs
-        SET status = ?, error = ?, completed_at = ?
-        WHERE status IN (?, ?)
-    """, (
-        JobStatus.FAILED.value,
-        "Server restarted - job interrupted",
-        datetime.now().isoformat(),
-        JobStatus.PENDING.value,
-        JobStatus.RUNNING.value
-    ))
-
-    affected = cursor.rowcount
-    conn.commit()
-    conn.close()
+    # Every orphan is failed by one UPDATE in one transaction
+    now = datetime.now().isoformat()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            UPDATE jobs
+            SET status = ?, error = ?, completed_at = ?, updated_at = ?
+            WHERE status IN (?, ?)
+        """, (
+            JobStatus.FAILED.value,
+            "Server restarted - job interrupted",
+            now,
+            now,
+            JobStatus.PENDING.value,
+            JobStatus.RUNNING.value
+        ))
+
+        affected = cursor.rowcount
+        conn.commit()
 
     if affected > 0:
         print(f"Cleaned up {affected} orphaned job(s) from previous session")
 
 
-# Thread-safe job runner
-_job_threads: dict[str, threading.Thread] = {}
+# Shared pool for background jobs. Thread startup is paid once, and repeated
+# clicks queue up (staying "pending") instead of running unbounded syncs at once.
+MAX_CONCURRENT_JOBS = 4
+_job_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_JOBS, thread_name_prefix="job")
 
 
 def run_job_async(job_id: str, job_func: Callable[[str], None]):
-    """Run a job function in a background thread."""
+    """Run a job function on the background job pool."""
     def wrapper():
         try:
             job_func(job_id)
         except Exception as e:
             fail_job(job_id, str(e))
-        finally:
-            # Cleanup thread reference
-            if job_id in _job_threads:
-                del _job_threads[job_id]
-
-    thread = threading.Thread(target=wrapper, daemon=True)
-    _job_threads[job_id] = thread
-    thread.start()
+
+    _job_executor.submit(wrapper)
 
     return job_id
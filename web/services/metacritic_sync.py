@@ -10,6 +10,24 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from bs4 import BeautifulSoup
 from urllib.parse import quote
 
+from .database_builder import BatchedWriter, ensure_games_columns
+
+
+# Common suffixes/prefixes that hurt search matching, removed in this order
+_NAME_CLEANUP_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r"\s*\(.*?\)",  # Remove parenthetical content
+        r"\s*-\s*Demo$",
+        r"\s*Demo$",
+        r"\s*\[.*?\]",  # Remove bracketed content
+        r"[™®©]",
+        r"\s*:\s*[^:]+Edition$",  # Remove edition suffixes
+        r"\s*Deluxe\s*Edition$",
+        r"\s*Gold\s*Edition$",
+        r"\s*GOTY\s*Edition$",
+    )
+]
+
 
 class MetacriticClient:
     """Client for fetching game data from Metacritic."""
@@ -198,36 +216,15 @@ class MetacriticClient:
         if not name:
             return ""
 
-        # Remove common suffixes/prefixes that hurt matching
-        patterns_to_remove = [
-            r"\s*\(.*?\)",  # Remove parenthetical content
-            r"\s*-\s*Demo$",
-            r"\s*Demo$",
-            r"\s*\[.*?\]",  # Remove bracketed content
-            r"™",
-            r"®",
-            r"©",
-            r"\s*:\s*[^:]+Edition$",  # Remove edition suffixes
-            r"\s*Deluxe\s*Edition$",
-            r"\s*Gold\s*Edition$",
-            r"\s*GOTY\s*Edition$",
-        ]
-
         clean = name
-        for pattern in patterns_to_remove:
-            clean = re.sub(pattern, "", clean, flags=re.IGNORECASE)
+        for pattern in _NAME_CLEANUP_PATTERNS:
+            clean = pattern.sub("", clean)
 
         return clean.strip()
 
 
 def add_metacritic_columns(conn):
     """Add Metacritic-related columns to the database if they don't exist."""
-    cursor = conn.cursor()
-
-    # Check existing columns
-    cursor.execute("PRAGMA table_info(games)")
-    existing_columns = {row[1] for row in cursor.fetchall()}
-
     new_columns = [
         ("metacritic_score", "INTEGER"),  # Critic score 0-100
         ("metacritic_user_score", "REAL"),  # User score 0-10
@@ -236,12 +233,7 @@ def add_metacritic_columns(conn):
         ("metacritic_matched_at", "TIMESTAMP"),
     ]
 
-    for col_name, col_type in new_columns:
-        if col_name not in existing_columns:
-            cursor.execute(f"ALTER TABLE games ADD COLUMN {col_name} {col_type}")
-            print(f"Added column: {col_name}")
-
-    conn.commit()
+    ensure_games_columns(conn, new_columns)
 
 
 def calculate_match_score(game_name, metacritic_result):
@@ -280,13 +272,13 @@ def calculate_match_score(game_name, metacritic_result):
 def _process_single_game(client, game_id, name):
     """
     Process a single game for Metacritic data.
-    Returns a tuple of (game_id, success, result_dict or error_message).
+    Returns a tuple of (game_id, name, success, result_dict or error_message).
     """
     try:
         results = client.search_game(name)
 
         if not results:
-            return (game_id, False, "No results")
+            return (game_id, name, False, "No results")
 
         # Find best match
         best_match = None
@@ -303,7 +295,7 @@ def _process_single_game(client, game_id, name):
             details = client.get_game_by_slug(best_match["slug"])
 
             if details:
-                return (game_id, True, {
+                return (game_id, name, True, {
                     "critic_score": details.get("critic_score"),
                     "user_score": details.get("user_score"),
                     "url": details.get("url"),
@@ -312,12 +304,31 @@ def _process_single_game(client, game_id, name):
                     "match_score": best_score,
                 })
             else:
-                return (game_id, False, f"Could not fetch details for: {best_match['slug']}")
+                return (game_id, name, False, f"Could not fetch details for: {best_match['slug']}")
         else:
-            return (game_id, False, f"No good match (best score: {best_score:.0f})")
+            return (game_id, name, False, f"No good match (best score: {best_score:.0f})")
 
     except Exception as e:
-        return (game_id, False, f"Error: {e}")
+        return (game_id, name, False, f"Error: {e}")
+
+
+# Statements used to write Metacritic sync results
+_UPDATE_METACRITIC_SQL = """
+    UPDATE games SET
+        metacritic_score = ?,
+        metacritic_user_score = ?,
+        metacritic_url = ?,
+        metacritic_slug = ?,
+        metacritic_matched_at = CURRENT_TIMESTAMP
+    WHERE LOWER(name) = LOWER(?)
+"""
+
+_MARK_METACRITIC_NOT_FOUND_SQL = """
+    UPDATE games SET
+        metacritic_score = -1,
+        metacritic_matched_at = CURRENT_TIMESTAMP
+    WHERE LOWER(name) = LOWER(?)
+"""
 
 
 def sync_games(conn, client, limit=None, force=False, max_workers=5, progress_callback=None):
@@ -334,13 +345,16 @@ def sync_games(conn, client, limit=None, force=False, max_workers=5, progress_ca
     cursor = conn.cursor()
 
     # Get games that haven't been matched yet (or all if force)
-    # Skip hidden games and deduplicate by name (for games owned on multiple stores)
+    # Skip hidden games and deduplicate by name (for games owned on multiple stores);
+    # the limit is applied in SQL (a negative LIMIT means no limit)
     if force:
         cursor.execute(
             """SELECT MIN(id) as id, name FROM games
                WHERE name IS NOT NULL AND (hidden IS NULL OR hidden = 0)
                GROUP BY LOWER(name)
-               ORDER BY name"""
+               ORDER BY name
+               LIMIT ?""",
+            (limit or -1,),
         )
     else:
         cursor.execute(
@@ -350,63 +364,49 @@ def sync_games(conn, client, limit=None, force=False, max_workers=5, progress_ca
                AND metacritic_slug IS NULL
                AND (hidden IS NULL OR hidden = 0)
                GROUP BY LOWER(name)
-               ORDER BY name"""
+               ORDER BY name
+               LIMIT ?""",
+            (limit or -1,),
         )
 
     games = cursor.fetchall()
 
-    if limit:
-        games = games[:limit]
-
     total = len(games)
     print(f"Processing {total} games for Metacritic scores with {max_workers} workers...")
 
     matched = 0
     failed = 0
     completed = 0
-    results_lock = threading.Lock()
+
+    # Results for a name are written to all games with that name
+    # (case-insensitive), so they stay in sync across stores
+    writer = BatchedWriter(conn, (_UPDATE_METACRITIC_SQL, _MARK_METACRITIC_NOT_FOUND_SQL))
 
     def update_database(game_id, name, result):
-        """Update the database with the result for all games with this name (handles multi-store ownership)."""
-        # Update all games with the same name (case-insensitive) to sync across stores
-        cursor.execute(
-            """UPDATE games SET
-                metacritic_score = ?,
-                metacritic_user_score = ?,
-                metacritic_url = ?,
-                metacritic_slug = ?,
-                metacritic_matched_at = CURRENT_TIMESTAMP
-            WHERE LOWER(name) = LOWER(?)""",
-            (
-                result["critic_score"],
-                result["user_score"],
-                result["url"],
-                result["slug"],
-                name,
-            ),
-        )
+        """Queue the result for all games with this name (handles multi-store ownership)."""
+        writer.add(_UPDATE_METACRITIC_SQL, (
+            result["critic_score"],
+            result["user_score"],
+            result["url"],
+            result["slug"],
+            name,
+        ))
 
     def mark_not_found(name):
-        """Mark all games with this name as searched but not found (metacritic_score = -1)."""
-        cursor.execute(
-            """UPDATE games SET
-                metacritic_score = -1,
-                metacritic_matched_at = CURRENT_TIMESTAMP
-            WHERE LOWER(name) = LOWER(?)""",
-            (name,),
-        )
+        """Queue all games with this name as searched but not found (metacritic_score = -1)."""
+        writer.add(_MARK_METACRITIC_NOT_FOUND_SQL, (name,))
 
     # Process games in parallel
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         # Submit all tasks
-        future_to_game = {
-            executor.submit(_process_single_game, client, game_id, name): (game_id, name)
+        futures = [
+            executor.submit(_process_single_game, client, game_id, name)
             for game_id, name in games
-        }
+        ]
 
-        # Process results as they complete
-        for future in as_completed(future_to_game):
-            game_id, name = future_to_game[future]
+        # Process results as they complete (each result names its game)
+        for future in as_completed(futures):
+            result_game_id, name, success, result = future.result()
             completed += 1
 
             # Report progress
@@ -414,14 +414,9 @@ def sync_games(conn, client, limit=None, force=False, max_workers=5, progress_ca
                 progress_callback(completed, total, f"Processing: {name[:50]}...")
 
             try:
-                result_game_id, success, result = future.result()
-
                 if success:
-                    # Update database (SQLite operations need to be serialized)
-                    with results_lock:
-                        update_database(result_game_id, name, result)
-                        conn.commit()
-                        matched += 1
+                    update_database(result_game_id, name, result)
+                    matched += 1
 
                     score_str = ""
                     if result.get("critic_score"):
@@ -433,20 +428,18 @@ def sync_games(conn, client, limit=None, force=False, max_workers=5, progress_ca
                     print(f"[{completed}/{total}] {name} → Matched: {result['match_name']} (match: {result['match_score']:.0f}){score_str}")
                 else:
                     # Mark as searched but not found
-                    with results_lock:
-                        mark_not_found(name)
-                        conn.commit()
-                        failed += 1
+                    mark_not_found(name)
+                    failed += 1
                     print(f"[{completed}/{total}] {name} → {result}")
 
             except Exception as e:
                 # Mark as searched but not found on exception
-                with results_lock:
-                    mark_not_found(name)
-                    conn.commit()
-                    failed += 1
+                mark_not_found(name)
+                failed += 1
                 print(f"[{completed}/{total}] {name} → Exception: {e}")
 
+    writer.flush()
+
     return matched, failed
 
 
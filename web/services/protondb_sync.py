@@ -2,11 +2,17 @@
 # Fetches ProtonDB Linux/Steam Deck compatibility data for Steam games
 
 import sqlite3
+import orjson
 import requests
 import time
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .database_builder import BatchedWriter, ensure_games_columns
+
 
 class ProtonDBClient:
     """Client for fetching game data from ProtonDB."""
@@ -19,6 +25,12 @@ class ProtonDBClient:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "application/json",
         })
+        # Keep a pooled connection per sync worker, and retry transient
+        # gateway errors instead of marking the game as not found
+        self.session.mount("https://", HTTPAdapter(
+            pool_maxsize=8,
+            max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+        ))
         self.last_request_time = 0
         self.min_request_interval = min_request_interval
         self._lock = threading.Lock()
@@ -57,7 +69,7 @@ class ProtonDBClient:
             return None
 
         try:
-            data = response.json()
+            data = orjson.loads(response.content)
             return {
                 "tier": data.get("tier"),
                 "score": data.get("score"),
@@ -73,12 +85,6 @@ class ProtonDBClient:
 
 def add_protondb_columns(conn):
     """Add ProtonDB-related columns to the database if they don't exist."""
-    cursor = conn.cursor()
-
-    # Check existing columns
-    cursor.execute("PRAGMA table_info(games)")
-    existing_columns = {row[1] for row in cursor.fetchall()}
-
     new_columns = [
         ("protondb_tier", "TEXT"),  # platinum/gold/silver/bronze/borked/pending
         ("protondb_score", "REAL"),  # numeric score (0-1)
@@ -88,32 +94,47 @@ def add_protondb_columns(conn):
         ("protondb_matched_at", "TIMESTAMP"),
     ]
 
-    for col_name, col_type in new_columns:
-        if col_name not in existing_columns:
-            cursor.execute(f"ALTER TABLE games ADD COLUMN {col_name} {col_type}")
-            print(f"Added column: {col_name}")
+    ensure_games_columns(conn, new_columns)
 
-    conn.commit()
 
-
-def _process_single_game(client, game_id, steam_id):
+def _process_single_game(client, steam_id):
     """
     Process a single game for ProtonDB data.
-    Returns a tuple of (game_id, success, result_dict or error_message).
+    Returns a tuple of (steam_id, success, result_dict or error_message).
     """
     try:
         data = client.get_game_by_steam_id(steam_id)
 
         if not data:
-            return (game_id, False, "No data found")
+            return (steam_id, False, "No data found")
 
         if not data.get("tier"):
-            return (game_id, False, "No tier data")
+            return (steam_id, False, "No tier data")
 
-        return (game_id, True, data)
+        return (steam_id, True, data)
 
     except Exception as e:
-        return (game_id, False, f"Error: {e}")
+        return (steam_id, False, f"Error: {e}")
+
+
+# Statements used to write ProtonDB sync results
+_UPDATE_PROTONDB_SQL = """
+    UPDATE games SET
+        protondb_tier = ?,
+        protondb_score = ?,
+        protondb_confidence = ?,
+        protondb_total = ?,
+        protondb_trending_tier = ?,
+        protondb_matched_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+"""
+
+_MARK_PROTONDB_NOT_FOUND_SQL = """
+    UPDATE games SET
+        protondb_tier = 'unknown',
+        protondb_matched_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+"""
 
 
 def sync_games(conn, client, force=False, max_workers=5, progress_callback=None):
@@ -158,56 +179,50 @@ def sync_games(conn, client, force=False, max_workers=5, progress_callback=None)
 
     games = cursor.fetchall()
 
-    total = len(games)
+    # Games owned on several stores share a Steam ID; look each ID up only once
+    game_ids_by_steam_id = {}
+    names_by_steam_id = {}
+    for game_id, steam_id, name in games:
+        game_ids_by_steam_id.setdefault(steam_id, []).append(game_id)
+        names_by_steam_id.setdefault(steam_id, name)
+
+    total = len(game_ids_by_steam_id)
     print(f"Processing {total} Steam games for ProtonDB data with {max_workers} workers...")
 
     matched = 0
     failed = 0
     completed = 0
-    results_lock = threading.Lock()
+
+    writer = BatchedWriter(conn, (_UPDATE_PROTONDB_SQL, _MARK_PROTONDB_NOT_FOUND_SQL))
 
     def update_database(game_id, result):
-        """Update the database with the result."""
-        cursor.execute(
-            """UPDATE games SET
-                protondb_tier = ?,
-                protondb_score = ?,
-                protondb_confidence = ?,
-                protondb_total = ?,
-                protondb_trending_tier = ?,
-                protondb_matched_at = CURRENT_TIMESTAMP
-            WHERE id = ?""",
-            (
-                result["tier"],
-                result["score"],
-                result["confidence"],
-                result["total"],
-                result["trending_tier"],
-                game_id,
-            ),
-        )
+        """Queue the result for the next database write."""
+        writer.add(_UPDATE_PROTONDB_SQL, (
+            result["tier"],
+            result["score"],
+            result["confidence"],
+            result["total"],
+            result["trending_tier"],
+            game_id,
+        ))
 
     def mark_not_found(game_id):
-        """Mark game as searched but not found (protondb_tier = 'unknown')."""
-        cursor.execute(
-            """UPDATE games SET
-                protondb_tier = 'unknown',
-                protondb_matched_at = CURRENT_TIMESTAMP
-            WHERE id = ?""",
-            (game_id,),
-        )
+        """Queue game as searched but not found (protondb_tier = 'unknown')."""
+        writer.add(_MARK_PROTONDB_NOT_FOUND_SQL, (game_id,))
 
     # Process games in parallel
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         # Submit all tasks
-        future_to_game = {
-            executor.submit(_process_single_game, client, game_id, steam_id): (game_id, steam_id, name)
-            for game_id, steam_id, name in games
-        }
-
-        # Process results as they complete
-        for future in as_completed(future_to_game):
-            game_id, steam_id, name = future_to_game[future]
+        futures = [
+            executor.submit(_process_single_game, client, steam_id)
+            for steam_id in game_ids_by_steam_id
+        ]
+
+        # Process results as they complete (each result carries its Steam ID)
+        for future in as_completed(futures):
+            steam_id, success, result = future.result()
+            game_ids = game_ids_by_steam_id[steam_id]
+            name = names_by_steam_id[steam_id]
             completed += 1
 
             # Report progress
@@ -215,34 +230,30 @@ def sync_games(conn, client, force=False, max_workers=5, progress_callback=None)
                 progress_callback(completed, total, f"Processing: {name[:50]}...")
 
             try:
-                result_game_id, success, result = future.result()
-
                 if success:
-                    # Update database (SQLite operations need to be serialized)
-                    with results_lock:
-                        update_database(result_game_id, result)
-                        conn.commit()
-                        matched += 1
+                    for game_id in game_ids:
+                        update_database(game_id, result)
+                    matched += len(game_ids)
 
                     tier = result.get("tier", "unknown")
                     total_reports = result.get("total", 0)
                     print(f"[{completed}/{total}] {name} → {tier} ({total_reports} reports)")
                 else:
                     # Mark as searched but not found
-                    with results_lock:
+                    for game_id in game_ids:
                         mark_not_found(game_id)
-                        conn.commit()
-                        failed += 1
+                    failed += len(game_ids)
                     print(f"[{completed}/{total}] {name} → {result}")
 
             except Exception as e:
                 # Mark as searched but not found on exception
-                with results_lock:
+                for game_id in game_ids:
                     mark_not_found(game_id)
-                    conn.commit()
-                    failed += 1
+                failed += len(game_ids)
                 print(f"[{completed}/{total}] {name} → Exception: {e}")
 
+    writer.flush()
+
     return matched, failed
 
 
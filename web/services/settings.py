@@ -3,10 +3,10 @@
 # Environment variables take precedence over database settings (for Docker)
 
 import os
-import sqlite3
+import time
 from datetime import datetime
 
-from ..config import DATABASE_PATH
+from ..database import connect
 
 # Setting keys
 STEAM_ID = "steam_id"
@@ -43,6 +43,16 @@ ENV_VAR_MAP = {
 }
 
 
+# In-process cache of database-backed values: key -> (fetched_at, value or None)
+SETTINGS_CACHE_TTL = 60  # seconds
+_settings_cache = {}
+
+
+def clear_settings_cache():
+    """Drop all cached setting values so the next read goes to the database."""
+    _settings_cache.clear()
+
+
 def _ensure_settings_table(conn):
     """Ensure the settings table exists."""
     cursor = conn.cursor()
@@ -65,30 +75,113 @@ def get_setting(key, default=None):
         if env_value:
             return env_value
 
+    # Serve recent database reads from the in-process cache
+    cached = _settings_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < SETTINGS_CACHE_TTL:
+        value = cached[1]
+        return value if value is not None else default
+
     # Fall back to database
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = connect()
         _ensure_settings_table(conn)
         cursor = conn.cursor()
         cursor.execute("SELECT value FROM settings WHERE key = ?", (key,))
         row = cursor.fetchone()
         conn.close()
-        return row[0] if row else default
+        value = row[0] if row else None
+        _settings_cache[key] = (time.monotonic(), value)
+        return value if value is not None else default
     except Exception:
         return default
 
 
+def get_settings_bulk(keys, conn=None):
+    """Get several settings with a single query. Environment variables take precedence.
+
+    Only keys that have a value are present in the returned dict. Pass an open
+    connection to reuse it instead of opening a new one.
+    """
+    settings = {}
+    missing = []
+    now = time.monotonic()
+    for key in keys:
+        env_var = ENV_VAR_MAP.get(key)
+        env_value = os.environ.get(env_var) if env_var else None
+        if env_value:
+            settings[key] = env_value
+            continue
+        cached = _settings_cache.get(key)
+        if cached is not None and now - cached[0] < SETTINGS_CACHE_TTL:
+            if cached[1] is not None:
+                settings[key] = cached[1]
+        else:
+            missing.append(key)
+
+    if not missing:
+        return settings
+
+    # Fetch everything not in the cache in one round-trip
+    try:
+        own_conn = conn is None
+        if own_conn:
+            conn = connect()
+        _ensure_settings_table(conn)
+        cursor = conn.cursor()
+        placeholders = ",".join("?" * len(missing))
+        cursor.execute(
+            f"SELECT key, value FROM settings WHERE key IN ({placeholders})", missing
+        )
+        rows = dict(cursor.fetchall())
+        if own_conn:
+            conn.close()
+    except Exception:
+        return settings
+
+    now = time.monotonic()
+    for key in missing:
+        value = rows.get(key)
+        _settings_cache[key] = (now, value)
+        if value is not None:
+            settings[key] = value
+    return settings
+
+
+# Update in place rather than INSERT OR REPLACE, which deletes and re-inserts the row
+_UPSERT_SETTING_SQL = """
+    INSERT INTO settings (key, value, updated_at)
+    VALUES (?, ?, ?)
+    ON CONFLICT(key) DO UPDATE SET
+        value = excluded.value,
+        updated_at = excluded.updated_at
+"""
+
+
 def set_setting(key, value):
     """Set a setting value in the database."""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = connect()
     _ensure_settings_table(conn)
     cursor = conn.cursor()
-    cursor.execute("""
-        INSERT OR REPLACE INTO settings (key, value, updated_at)
-        VALUES (?, ?, ?)
-    """, (key, value, datetime.now().isoformat()))
+    cursor.execute(_UPSERT_SETTING_SQL, (key, value, datetime.now().isoformat()))
+    conn.commit()
+    conn.close()
+    _settings_cache[key] = (time.monotonic(), value)
+
+
+def set_settings(values):
+    """Set several settings at once in a single transaction."""
+    now = datetime.now().isoformat()
+    conn = connect()
+    _ensure_settings_table(conn)
+    cursor = conn.cursor()
+    cursor.executemany(
+        _UPSERT_SETTING_SQL, [(key, value, now) for key, value in values.items()]
+    )
     conn.commit()
     conn.close()
+    fetched_at = time.monotonic()
+    for key, value in values.items():
+        _settings_cache[key] = (fetched_at, value)
 
 
 def get_all_settings():
@@ -97,7 +190,7 @@ def get_all_settings():
 
     # Get database settings first
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = connect()
         _ensure_settings_table(conn)
         cursor = conn.cursor()
         cursor.execute("SELECT key, value FROM settings")
@@ -118,11 +211,12 @@ def get_all_settings():
 
 def delete_setting(key):
     """Delete a setting from the database."""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = connect()
     cursor = conn.cursor()
     cursor.execute("DELETE FROM settings WHERE key = ?", (key,))
     conn.commit()
     conn.close()
+    _settings_cache.pop(key, None)
 
 
 # Convenience functions for specific settings
@@ -8,7 +8,8 @@ import shutil
 import os
 from pathlib import Path
 
-from ..config import DATABASE_PATH
+from ..database import connect
+from ..services.database_builder import upsert_games
 
 # Nile config path - same logic as Nile uses
 NILE_CONFIG_PATH = Path(
@@ -253,9 +254,16 @@ def logout():
     return True, "Logged out successfully"
 
 
+_IMPORT_SQL = """
+    INSERT OR REPLACE INTO games (
+        name, store, store_id, cover_image, icon,
+        developers, publishers, extra_data, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
 def main():
     import argparse
-    import sqlite3
     from datetime import datetime
 
     parser = argparse.ArgumentParser(description="Import Amazon Games library via Nile")
@@ -315,35 +323,30 @@ def main():
         print(f"Exported to {args.export}")
     else:
         # Import to database
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = connect()
         cursor = conn.cursor()
 
-        count = 0
+        now = datetime.now().isoformat()
+        rows = []
         for game in games:
             try:
                 developers = [game.get("developer")] if game.get("developer") else None
                 publishers = [game.get("publisher")] if game.get("publisher") else None
 
-                cursor.execute(
-                    """INSERT OR REPLACE INTO games (
-                        name, store, store_id, cover_image, icon,
-                        developers, publishers, extra_data, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                    (
-                        game.get("name"),
-                        "amazon",
-                        game.get("product_id"),
-                        game.get("icon_url"),
-                        game.get("icon_url"),
-                        json.dumps(developers) if developers else None,
-                        json.dumps(publishers) if publishers else None,
-                        json.dumps(game.get("raw_data", {})),
-                        datetime.now().isoformat(),
-                    ),
-                )
-                count += 1
+                rows.append((
+                    game.get("name"),
+                    "amazon",
+                    game.get("product_id"),
+                    game.get("icon_url"),
+                    game.get("icon_url"),
+                    json.dumps(developers) if developers else None,
+                    json.dumps(publishers) if publishers else None,
+                    json.dumps(game.get("raw_data", {})),
+                    now,
+                ))
             except Exception as e:
                 print(f"  Error importing {game.get('name')}: {e}")
+        count = len(upsert_games(cursor, _IMPORT_SQL, rows))
 
         conn.commit()
         conn.close()
@@ -2,18 +2,23 @@
 # Fetches owned games from Battle.net using session cookie authentication
 
 import json
-import sqlite3
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from ..services.settings import get_battlenet_credentials
-from ..config import DATABASE_PATH
+from ..database import connect
+from ..services.database_builder import upsert_games
 
 # Battle.net API endpoints (from Playnite implementation)
 API_BASE = "https://account.battle.net/api"
 GAMES_SUBS_ENDPOINT = f"{API_BASE}/games-and-subs"
 CLASSIC_GAMES_ENDPOINT = f"{API_BASE}/classic-games"
 
+# Store ID for classic games without a title ID: lowercased name with spaces
+# and dashes turned into underscores and colons dropped
+_CLASSIC_STORE_ID_TABLE = str.maketrans({" ": "_", "-": "_", ":": None})
+
 # Required headers for API requests
 REQUIRED_HEADERS = {
     "Accept": "application/json",
@@ -145,7 +150,7 @@ def get_classic_games(session):
             # Classic games may not have title IDs, use name as identifier
             store_id = game.get("titleId")
             if not store_id:
-                store_id = name.lower().replace(" ", "_").replace(":", "").replace("-", "_")
+                store_id = name.lower().translate(_CLASSIC_STORE_ID_TABLE)
 
             # Build cover image URL if available
             icon_filename = game.get("regionalGameFranchiseIconFilename") or game.get("gameIconFilename")
@@ -188,12 +193,13 @@ def get_battlenet_library():
 
     print("Fetching Battle.net library...")
 
-    # Get modern games
-    modern_games = get_owned_games(session)
+    # The modern and classic lists come from independent endpoints, fetch both at once
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        modern_future = executor.submit(get_owned_games, session)
+        classic_future = executor.submit(get_classic_games, session)
+        modern_games = modern_future.result()
+        classic_games = classic_future.result()
     print(f"  Found {len(modern_games)} modern games")
-
-    # Get classic games
-    classic_games = get_classic_games(session)
     print(f"  Found {len(classic_games)} classic games")
 
     # Combine and deduplicate by title_id
@@ -211,31 +217,34 @@ def get_battlenet_library():
     return all_games
 
 
+_IMPORT_SQL = """
+    INSERT OR REPLACE INTO games (
+        name, store, store_id, cover_image,
+        extra_data, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
 def import_to_database(games):
     """Import Battle.net games to the database."""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = connect()
     cursor = conn.cursor()
 
-    count = 0
+    now = datetime.now().isoformat()
+    rows = []
     for game in games:
         try:
-            cursor.execute(
-                """INSERT OR REPLACE INTO games (
-                    name, store, store_id, cover_image,
-                    extra_data, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?)""",
-                (
-                    game.get("name"),
-                    "battlenet",
-                    game.get("title_id"),
-                    game.get("cover_image"),
-                    json.dumps(game.get("raw_data", {})),
-                    datetime.now().isoformat(),
-                ),
-            )
-            count += 1
+            rows.append((
+                game.get("name"),
+                "battlenet",
+                game.get("title_id"),
+                game.get("cover_image"),
+                json.dumps(game.get("raw_data", {})),
+                now,
+            ))
         except Exception as e:
             print(f"Error importing {game.get('name')}: {e}")
+    count = len(upsert_games(cursor, _IMPORT_SQL, rows))
 
     conn.commit()
     conn.close()
@@ -5,6 +5,7 @@
 
 import json
 import requests
+import traceback
 
 from ..services.settings import get_ea_credentials
 
@@ -191,7 +192,6 @@ def get_owned_games(token):
 
     except Exception as e:
         print(f"Error fetching games: {e}")
-        import traceback
         traceback.print_exc()
         return []
 
@@ -6,6 +6,8 @@ import json
 import sys
 import time
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 
 
 def is_legendary_installed():
@@ -210,6 +212,26 @@ def _fetch_slug_from_graphql(namespace):
     return None
 
 
+# GraphQL slug lookups run on a few threads but stay spaced out globally
+_GRAPHQL_WORKERS = 4
+_GRAPHQL_MIN_INTERVAL = 0.15
+_graphql_rate_lock = Lock()
+_last_graphql_request = 0
+
+
+def _fetch_slug_rate_limited(namespace):
+    """Fetch a namespace's slug via GraphQL, keeping requests _GRAPHQL_MIN_INTERVAL apart."""
+    global _last_graphql_request
+
+    with _graphql_rate_lock:
+        elapsed = time.time() - _last_graphql_request
+        if elapsed < _GRAPHQL_MIN_INTERVAL:
+            time.sleep(_GRAPHQL_MIN_INTERVAL - elapsed)
+        _last_graphql_request = time.time()
+
+    return _fetch_slug_from_graphql(namespace)
+
+
 def _parse_game(game):
     """Parse a game object from legendary JSON into our format."""
     metadata = game.get("metadata", {})
@@ -391,12 +413,16 @@ def get_epic_library_legendary():
         graphql_count = 0
         if remaining:
             print(f"  Querying GraphQL for {len(remaining)} remaining games...")
+            # Games sharing a namespace need only one lookup; the requests
+            # overlap on the network while the rate limiter keeps them spaced
+            namespaces = list({game["namespace"] for game in remaining})
+            with ThreadPoolExecutor(max_workers=_GRAPHQL_WORKERS) as executor:
+                slugs = dict(zip(namespaces, executor.map(_fetch_slug_rate_limited, namespaces)))
             for game in remaining:
-                slug = _fetch_slug_from_graphql(game["namespace"])
+                slug = slugs.get(game["namespace"])
                 if slug:
                     game["product_slug"] = slug
                     graphql_count += 1
-                time.sleep(0.15)
 
         total = mapping_count + graphql_count
         still_missing = sum(1 for g in games if not g.get("product_slug"))
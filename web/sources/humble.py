@@ -2,17 +2,21 @@
 # Fetches owned games from Humble Bundle using session cookie authentication
 
 import json
-import sqlite3
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from ..services.settings import get_humble_credentials
-from ..config import DATABASE_PATH
+from ..database import connect
+from ..services.database_builder import upsert_games
 
 # Humble Bundle API endpoints
 API_BASE = "https://www.humblebundle.com"
 ORDERS_ENDPOINT = f"{API_BASE}/api/v1/user/order"
 
+# Parallel order-detail requests per sync
+ORDER_DETAIL_WORKERS = 4
+
 # Required header for API requests
 REQUIRED_HEADERS = {
     "X-Requested-By": "hb_android_app",
@@ -35,23 +39,6 @@ def get_session():
     return session
 
 
-def verify_session(session):
-    """Verify the session is authenticated."""
-    try:
-        response = session.get(ORDERS_ENDPOINT)
-        if response.status_code == 200:
-            data = response.json()
-            # If we get a list of orders, we're authenticated
-            if isinstance(data, list):
-                print(f"Authenticated - found {len(data)} orders")
-                return True
-        print(f"Authentication failed: {response.status_code}")
-        return False
-    except Exception as e:
-        print(f"Error verifying session: {e}")
-        return False
-
-
 def get_order_details(session, gamekey):
     """Fetch details for a specific order."""
     try:
@@ -76,114 +63,117 @@ def get_humble_library():
         print("4. Add it in the Settings page")
         return None
 
-    if not verify_session(session):
-        print("Error: Session cookie is invalid or expired")
-        print("Please update your Humble Bundle session cookie in Settings")
-        return None
-
     print("Fetching Humble Bundle orders...")
 
-    # Get all orders
+    # Get all orders (this also verifies the session, so the order list is
+    # only downloaded once)
     try:
         response = session.get(ORDERS_ENDPOINT)
-        if response.status_code != 200:
-            print(f"Failed to fetch orders: {response.status_code}")
-            return None
-
-        orders = response.json()
-        print(f"Found {len(orders)} orders")
+        orders = response.json() if response.status_code == 200 else None
     except Exception as e:
         print(f"Error fetching orders: {e}")
         return None
 
+    if not isinstance(orders, list):
+        print(f"Authentication failed: {response.status_code}")
+        print("Error: Session cookie is invalid or expired")
+        print("Please update your Humble Bundle session cookie in Settings")
+        return None
+
+    print(f"Authenticated - found {len(orders)} orders")
+
     games = []
     processed_keys = set()  # Track unique game keys to avoid duplicates
 
-    # Process each order
-    for i, order in enumerate(orders):
-        gamekey = order.get("gamekey")
-        if not gamekey:
-            continue
-
-        print(f"  Processing order {i + 1}/{len(orders)}: {gamekey[:8]}...")
+    # Fetch order details concurrently; map() keeps them in order, so
+    # duplicates are still resolved in favour of the earliest order
+    gamekeys = [order.get("gamekey") for order in orders if order.get("gamekey")]
+    with ThreadPoolExecutor(max_workers=ORDER_DETAIL_WORKERS) as executor:
+        details = executor.map(lambda gamekey: get_order_details(session, gamekey), gamekeys)
 
-        order_details = get_order_details(session, gamekey)
-        if not order_details:
-            continue
+        # Process each order
+        for i, (gamekey, order_details) in enumerate(zip(gamekeys, details)):
+            print(f"  Processing order {i + 1}/{len(gamekeys)}: {gamekey[:8]}...")
 
-        # Extract products (games) from the order
-        products = order_details.get("subproducts", [])
-        for product in products:
-            machine_name = product.get("machine_name")
-            if not machine_name or machine_name in processed_keys:
+            if not order_details:
                 continue
 
-            processed_keys.add(machine_name)
-
-            # Extract platform information
-            downloads = product.get("downloads", [])
-            platforms = set()
-            for download in downloads:
-                platform = download.get("platform", "").lower()
-                if platform == "windows":
-                    platforms.add("Windows")
-                elif platform == "mac":
-                    platforms.add("Mac")
-                elif platform == "linux":
-                    platforms.add("Linux")
-                elif platform == "android":
-                    platforms.add("Android")
-
-            # Get the best available icon/image
-            icon = product.get("icon") or product.get("human_icon")
-
-            # Extract URL if available
-            url = product.get("url")
-
-            games.append({
-                "machine_name": machine_name,
-                "human_name": product.get("human_name"),
-                "icon": icon,
-                "url": url,
-                "platforms": list(platforms),
-                "payee": order_details.get("payee", {}).get("human_name"),  # Publisher
-                "created": order_details.get("created"),  # Order date
-                "gamekey": gamekey,
-            })
+            # Extract products (games) from the order
+            products = order_details.get("subproducts", [])
+            for product in products:
+                machine_name = product.get("machine_name")
+                if not machine_name or machine_name in processed_keys:
+                    continue
+
+                processed_keys.add(machine_name)
+
+                # Extract platform information
+                downloads = product.get("downloads", [])
+                platforms = set()
+                for download in downloads:
+                    platform = download.get("platform", "").lower()
+                    if platform == "windows":
+                        platforms.add("Windows")
+                    elif platform == "mac":
+                        platforms.add("Mac")
+                    elif platform == "linux":
+                        platforms.add("Linux")
+                    elif platform == "android":
+                        platforms.add("Android")
+
+                # Get the best available icon/image
+                icon = product.get("icon") or product.get("human_icon")
+
+                # Extract URL if available
+                url = product.get("url")
+
+                games.append({
+                    "machine_name": machine_name,
+                    "human_name": product.get("human_name"),
+                    "icon": icon,
+                    "url": url,
+                    "platforms": list(platforms),
+                    "payee": order_details.get("payee", {}).get("human_name"),  # Publisher
+                    "created": order_details.get("created"),  # Order date
+                    "gamekey": gamekey,
+                })
 
     return games
 
 
+_IMPORT_SQL = """
+    INSERT OR REPLACE INTO games (
+        name, store, store_id, cover_image, icon,
+        supported_platforms, publishers, release_date,
+        extra_data, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
 def import_to_database(games):
     """Import Humble Bundle games to the database."""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = connect()
     cursor = conn.cursor()
 
-    count = 0
+    now = datetime.now().isoformat()
+    rows = []
     for game in games:
         try:
-            cursor.execute(
-                """INSERT OR REPLACE INTO games (
-                    name, store, store_id, cover_image, icon,
-                    supported_platforms, publishers, release_date,
-                    extra_data, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    game.get("human_name"),
-                    "humble",
-                    game.get("machine_name"),
-                    game.get("icon"),
-                    game.get("icon"),
-                    json.dumps(game.get("platforms", [])),
-                    json.dumps([game.get("payee")]) if game.get("payee") else None,
-                    game.get("created"),
-                    json.dumps(game),
-                    datetime.now().isoformat(),
-                ),
-            )
-            count += 1
+            rows.append((
+                game.get("human_name"),
+                "humble",
+                game.get("machine_name"),
+                game.get("icon"),
+                game.get("icon"),
+                json.dumps(game.get("platforms", [])),
+                json.dumps([game.get("payee")]) if game.get("payee") else None,
+                game.get("created"),
+                json.dumps(game),
+                now,
+            ))
         except Exception as e:
             print(f"Error importing {game.get('human_name')}: {e}")
+    count = len(upsert_games(cursor, _IMPORT_SQL, rows))
 
     conn.commit()
     conn.close()
@@ -3,7 +3,6 @@
 
 import os
 import json
-import sqlite3
 import webbrowser
 import requests
 from pathlib import Path
@@ -18,7 +17,8 @@ except ImportError:
     pass
 
 from ..services.settings import get_itch_credentials
-from ..config import DATABASE_PATH
+from ..database import connect
+from ..services.database_builder import upsert_games
 
 # OAuth client ID can still come from .env as it's not sensitive
 ITCH_CLIENT_ID = os.getenv("ITCH_CLIENT_ID")
@@ -214,10 +214,13 @@ def get_owned_games(token):
     games = []
     page = 1
 
+    # Keep-alive session so each page reuses the same connection
+    session = requests.Session()
+    session.headers.update({"Authorization": f"Bearer {token}"})
+
     while True:
-        response = requests.get(
+        response = session.get(
             f"{API_BASE}/profile/owned-keys",
-            headers={"Authorization": f"Bearer {token}"},
             params={"page": page},
         )
 
@@ -263,12 +266,21 @@ def get_owned_games(token):
     return games
 
 
+_IMPORT_SQL = """
+    INSERT OR REPLACE INTO games (
+        name, store, store_id, description, cover_image,
+        supported_platforms, release_date, extra_data, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
 def import_to_database(games):
     """Import itch.io games to the database."""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = connect()
     cursor = conn.cursor()
 
-    count = 0
+    now = datetime.now().isoformat()
+    rows = []
     for game in games:
         try:
             # Build platforms list
@@ -282,26 +294,20 @@ def import_to_database(games):
             if game["platforms"].get("android"):
                 platforms.append("Android")
 
-            cursor.execute(
-                """INSERT OR REPLACE INTO games (
-                    name, store, store_id, description, cover_image,
-                    supported_platforms, release_date, extra_data, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    game.get("title"),
-                    "itch",
-                    str(game.get("id")),
-                    game.get("short_text"),
-                    game.get("cover_url"),
-                    json.dumps(platforms) if platforms else None,
-                    game.get("published_at"),
-                    json.dumps(game),
-                    datetime.now().isoformat(),
-                ),
-            )
-            count += 1
+            rows.append((
+                game.get("title"),
+                "itch",
+                str(game.get("id")),
+                game.get("short_text"),
+                game.get("cover_url"),
+                json.dumps(platforms) if platforms else None,
+                game.get("published_at"),
+                json.dumps(game),
+                now,
+            ))
         except Exception as e:
             print(f"Error importing {game.get('title')}: {e}")
+    count = len(upsert_games(cursor, _IMPORT_SQL, rows))
 
     conn.commit()
     conn.close()
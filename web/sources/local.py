@@ -4,6 +4,7 @@
 import os
 import json
 import hashlib
+import time
 from pathlib import Path
 
 from ..services.settings import get_local_games_settings
@@ -17,8 +18,31 @@ def discover_local_game_paths():
     Returns a list of valid paths that exist and contain game folders.
     """
     settings = get_local_games_settings()
-    paths_str = settings.get("paths", "")
+    return _discover_paths(settings.get("paths") or "")
 
+
+# The settings page only displays the discovered paths, so it reuses a recent
+# scan. Entries are keyed by the configured paths string, so changing the
+# setting is picked up immediately; folder contents are re-checked after the TTL.
+DISCOVERY_CACHE_TTL = 60  # seconds
+_discovery_cache = {}
+
+
+def get_cached_local_game_paths():
+    """Like discover_local_game_paths(), but reuses a scan from the last minute."""
+    paths_str = get_local_games_settings().get("paths") or ""
+    cached = _discovery_cache.get(paths_str)
+    if cached and time.monotonic() - cached[0] < DISCOVERY_CACHE_TTL:
+        return cached[1]
+
+    valid_paths = _discover_paths(paths_str)
+    _discovery_cache.clear()
+    _discovery_cache[paths_str] = (time.monotonic(), valid_paths)
+    return valid_paths
+
+
+def _discover_paths(paths_str):
+    """Resolve configured (or auto-discovered) paths to folders that contain games."""
     paths = []
 
     if paths_str:
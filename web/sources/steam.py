@@ -3,34 +3,131 @@
 
 import requests
 import json
+import orjson
+import sqlite3
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from threading import Lock
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..database import connect
 from ..services.settings import get_steam_credentials
 
-# Rate limiting for Steam Store API
+# Rate limiting for Steam Store API. The gap between requests adapts: it
+# doubles on 429 responses and halves back towards the floor on success.
 _rate_limit_lock = Lock()
 _last_request_time = 0
 _MIN_REQUEST_INTERVAL = 0.2  # 200ms between requests (5 req/sec max)
+_MAX_REQUEST_INTERVAL = 5.0
+_MAX_RETRY_AFTER = 60.0
+_request_interval = _MIN_REQUEST_INTERVAL
+
+# Shared keep-alive session for Steam API/Store calls, so review lookups for a
+# whole library reuse pooled connections instead of a TCP+TLS handshake each.
+# Pool size covers the review-fetching worker threads.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+))
+
+
+# Review summaries are cached in SQLite so a re-import only asks the Store for
+# games it has not looked up recently. Only successful lookups are stored, so
+# failed or empty ones are retried on the next import.
+REVIEW_CACHE_TTL_DAYS = 7
+_REVIEW_CACHE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS steam_review_cache (
+        appid INTEGER PRIMARY KEY,
+        body BLOB NOT NULL,
+        fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+_SELECT_REVIEW_CACHE_SQL = """
+    SELECT appid, body FROM steam_review_cache
+    WHERE fetched_at >= datetime('now', ?)
+"""
+_UPSERT_REVIEW_CACHE_SQL = """
+    INSERT OR REPLACE INTO steam_review_cache (appid, body, fetched_at)
+    VALUES (?, ?, CURRENT_TIMESTAMP)
+"""
+
+
+def _load_review_cache():
+    """Return {appid: reviews} for review summaries still within the TTL."""
+    try:
+        conn = connect()
+        try:
+            conn.execute(_REVIEW_CACHE_TABLE_SQL)
+            rows = conn.execute(
+                _SELECT_REVIEW_CACHE_SQL, (f"-{REVIEW_CACHE_TTL_DAYS} days",)
+            ).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"  Steam review cache unavailable: {e}")
+        return {}
+    return {appid: orjson.loads(body) for appid, body in rows}
+
+
+def _save_review_cache(fetched):
+    """Store freshly fetched review summaries ({appid: reviews})."""
+    if not fetched:
+        return
+    try:
+        conn = connect()
+        try:
+            conn.execute(_REVIEW_CACHE_TABLE_SQL)
+            conn.executemany(_UPSERT_REVIEW_CACHE_SQL, [
+                (appid, orjson.dumps(reviews)) for appid, reviews in fetched.items()
+            ])
+            conn.commit()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"  Could not update Steam review cache: {e}")
+
+
+def _retry_after_seconds(response):
+    """Return the Retry-After delay of a response in seconds, if given."""
+    try:
+        return min(float(response.headers.get("Retry-After", "")), _MAX_RETRY_AFTER)
+    except ValueError:
+        return None
 
 
 def _rate_limited_request(url, params=None):
-    """Make a rate-limited request to Steam Store API."""
-    global _last_request_time
+    """Make a rate-limited request to Steam Store API (retried once after a 429)."""
+    global _last_request_time, _request_interval
+
+    response = None
+    for _ in range(2):
+        with _rate_limit_lock:
+            elapsed = time.time() - _last_request_time
+            if elapsed < _request_interval:
+                time.sleep(_request_interval - elapsed)
+            _last_request_time = time.time()
+
+        try:
+            response = _session.get(url, params=params, timeout=10)
+        except requests.RequestException:
+            return None
 
-    with _rate_limit_lock:
-        now = time.time()
-        elapsed = now - _last_request_time
-        if elapsed < _MIN_REQUEST_INTERVAL:
-            time.sleep(_MIN_REQUEST_INTERVAL - elapsed)
-        _last_request_time = time.time()
+        if response.status_code != 429:
+            _request_interval = max(_MIN_REQUEST_INTERVAL, _request_interval / 2)
+            return response
 
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        return response
-    except requests.RequestException:
-        return None
+        _request_interval = min(_MAX_REQUEST_INTERVAL, _request_interval * 2)
+        retry_after = _retry_after_seconds(response) or _request_interval
+        with _rate_limit_lock:
+            # Hold every worker off until Steam's Retry-After has passed
+            _last_request_time = max(
+                _last_request_time, time.time() + retry_after - _request_interval
+            )
+
+    return response
 
 
 def get_steam_review_score(appid):
@@ -45,7 +142,8 @@ def get_steam_review_score(appid):
     params = {
         "json": 1,
         "language": "all",
-        "purchase_type": "all"
+        "purchase_type": "all",
+        "num_per_page": 0  # Only the query_summary is used, skip the review texts
     }
 
     response = _rate_limited_request(url, params)
@@ -53,7 +151,7 @@ def get_steam_review_score(appid):
         return None
 
     try:
-        data = response.json()
+        data = orjson.loads(response.content)
         summary = data.get("query_summary", {})
 
         total_positive = summary.get("total_positive", 0)
@@ -75,8 +173,12 @@ def get_steam_review_score(appid):
         return None
 
 
-def _fetch_game_with_reviews(game_data):
-    """Fetch a single game's review data and merge with game info."""
+def _fetch_game_with_reviews(game_data, review_cache, fetched):
+    """Fetch a single game's review data and merge with game info.
+
+    Cached reviews are used when present; successful fresh lookups are
+    recorded in ``fetched`` so they can be written back to the cache.
+    """
     appid = game_data.get("appid")
 
     result = {
@@ -87,7 +189,12 @@ def _fetch_game_with_reviews(game_data):
     }
 
     # Fetch review score
-    reviews = get_steam_review_score(appid)
+    if appid in review_cache:
+        reviews = review_cache[appid]
+    else:
+        reviews = get_steam_review_score(appid)
+        if reviews:
+            fetched[appid] = reviews
     if reviews:
         result["review_score"] = reviews["review_score"]
         result["review_desc"] = reviews["review_desc"]
@@ -96,12 +203,13 @@ def _fetch_game_with_reviews(game_data):
     return result
 
 
-def get_steam_library(fetch_reviews=True, max_workers=5):
+def get_steam_library(fetch_reviews=True, max_workers=5, ignore_cache=False):
     """Fetch games from Steam library using credentials from database.
 
     Args:
         fetch_reviews: Whether to fetch review scores (slower but more data)
         max_workers: Number of threads for parallel review fetching
+        ignore_cache: Re-fetch every review score instead of using cached ones
     """
     creds = get_steam_credentials()
     STEAM_API_KEY = creds.get("api_key")
@@ -119,8 +227,8 @@ def get_steam_library(fetch_reviews=True, max_workers=5):
         "include_played_free_games": True
     }
 
-    response = requests.get(url, params=params)
-    data = response.json()
+    response = _session.get(url, params=params)
+    data = orjson.loads(response.content)
 
     raw_games = data.get("response", {}).get("games", [])
 
@@ -141,11 +249,15 @@ def get_steam_library(fetch_reviews=True, max_workers=5):
     total = len(raw_games)
     completed = 0
 
-    print(f"  Fetching review scores for {total} games ({max_workers} threads)...")
+    review_cache = {} if ignore_cache else _load_review_cache()
+    fetched = {}
+    cached = sum(1 for game in raw_games if game.get("appid") in review_cache)
+
+    print(f"  Fetching review scores for {total} games ({max_workers} threads, {cached} cached)...")
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         future_to_game = {
-            executor.submit(_fetch_game_with_reviews, game): game
+            executor.submit(_fetch_game_with_reviews, game, review_cache, fetched): game
             for game in raw_games
         }
 
@@ -167,16 +279,18 @@ def get_steam_library(fetch_reviews=True, max_workers=5):
                     "icon_url": f"https://media.steampowered.com/steamcommunity/public/images/apps/{game['appid']}/{game.get('img_icon_url')}.jpg"
                 })
 
+    _save_review_cache(fetched)
     return games
 
 
 if __name__ == "__main__":
     import sys
 
-    # Allow skipping reviews for quick testing
+    # Allow skipping reviews for quick testing, or re-fetching cached ones
     fetch_reviews = "--no-reviews" not in sys.argv
+    ignore_cache = "--ignore-cache" in sys.argv
 
-    library = get_steam_library(fetch_reviews=fetch_reviews)
+    library = get_steam_library(fetch_reviews=fetch_reviews, ignore_cache=ignore_cache)
     with open("steam_library.json", "w") as f:
         json.dump(library, f, indent=2)
 
@@ -2,8 +2,11 @@
 # Fetches owned games and Game Pass catalog from Xbox using XSTS token authentication
 # User obtains XSTS token via browser DevTools network tab
 
+import base64
 import json
 import requests
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 
 from ..services.settings import get_xbox_credentials, get_xbox_gamepass_settings
 
@@ -43,6 +46,14 @@ REQUIRED_HEADERS = {
     "x-xbl-contract-version": "2",
 }
 
+# Display Catalog batch requests in flight at once during a Game Pass import
+CATALOG_DETAIL_WORKERS = 4
+
+# Shared keep-alive session, so the batched catalog lookups of a Game Pass
+# import reuse connections instead of a TCP+TLS handshake per request
+_session = requests.Session()
+
+
 def get_resolved_xbox_gamepass_settings():
     """Get Xbox Game Pass settings."""
     gamepass_settings = get_xbox_gamepass_settings()
@@ -97,7 +108,6 @@ def parse_xsts_token(token):
         # For JWT tokens, we need a userhash. Try to decode and extract.
         # If we can't, just use a placeholder - the API might still work
         try:
-            import base64
             # JWT is header.payload.signature - decode the payload
             parts = token.split(".")
             if len(parts) >= 2:
@@ -107,7 +117,6 @@ def parse_xsts_token(token):
                 if padding != 4:
                     payload += "=" * padding
                 decoded = base64.urlsafe_b64decode(payload)
-                import json
                 claims = json.loads(decoded)
                 # Look for userhash in claims
                 userhash = claims.get("xui", [{}])[0].get("uhs") if claims.get("xui") else None
@@ -140,7 +149,7 @@ def get_xuid_from_token(token):
         }
 
         # Get current user's profile to extract XUID
-        response = requests.get(
+        response = _session.get(
             "https://profile.xboxlive.com/users/me/profile/settings",
             headers=headers,
             params={"settings": "Gamertag"}
@@ -195,7 +204,7 @@ def get_owned_games(token, market, xuid=None):
         }
 
         print(f"  Fetching owned games for XUID: {xuid}")
-        response = requests.get(url, headers=headers, params=params)
+        response = _session.get(url, headers=headers, params=params)
 
         if response.status_code == 401:
             print("  Token expired or invalid - please get a new XSTS token")
@@ -257,7 +266,6 @@ def get_owned_games(token, market, xuid=None):
 
     except Exception as e:
         print(f"  Error fetching owned games: {e}")
-        import traceback
         traceback.print_exc()
         return []
 
@@ -286,7 +294,7 @@ def get_owned_games_from_collections(token, market):
             "maxPageSize": 1000,
         }
 
-        response = requests.post(
+        response = _session.post(
             COLLECTIONS_ENDPOINT,
             headers=headers,
             json=payload
@@ -350,7 +358,7 @@ def get_gamepass_catalog(plan, market):
         url = f"{GAMEPASS_CATALOG_ENDPOINT}?id={collection_id}&language=en-US&market={market}&platformContext=pc&subscriptionContext={subscription_id}"
 
         print(f"  Fetching Game Pass catalog for plan: {plan} (market: {market})...")
-        response = requests.get(url, headers=REQUIRED_HEADERS)
+        response = _session.get(url, headers=REQUIRED_HEADERS)
 
         if response.status_code != 200:
             print(f"  Game Pass catalog error: {response.status_code}")
@@ -368,18 +376,18 @@ def get_gamepass_catalog(plan, market):
 
         print(f"  Found {len(product_ids)} Game Pass titles, fetching details...")
 
-        # Fetch product details in batches
+        # Fetch product details in batches, a few batches at a time (map()
+        # keeps the catalog order)
         batch_size = 20
-        for i in range(0, len(product_ids), batch_size):
-            batch = product_ids[i:i + batch_size]
-            details = get_product_details(batch, market)
-            all_games.extend(details)
+        batches = [product_ids[i:i + batch_size] for i in range(0, len(product_ids), batch_size)]
+        with ThreadPoolExecutor(max_workers=CATALOG_DETAIL_WORKERS) as executor:
+            for details in executor.map(lambda batch: get_product_details(batch, market), batches):
+                all_games.extend(details)
 
         return all_games
 
     except Exception as e:
         print(f"  Error fetching Game Pass catalog: {e}")
-        import traceback
         traceback.print_exc()
         return []
 
@@ -394,7 +402,7 @@ def get_product_details(product_ids, market):
         ids_param = ",".join(product_ids)
         url = f"{DISPLAY_CATALOG_ENDPOINT}?bigIds={ids_param}&market={market}&languages=en-US"
 
-        response = requests.get(url, headers=REQUIRED_HEADERS)
+        response = _session.get(url, headers=REQUIRED_HEADERS)
 
         if response.status_code != 200:
             print(f"  Display catalog error: {response.status_code}")
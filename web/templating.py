@@ -0,0 +1,14 @@
+# templating.py
+# Shared Jinja2 templates instance used by all routers
+
+from pathlib import Path
+
+from fastapi.templating import Jinja2Templates
+
+from .config import DEBUG
+
+templates = Jinja2Templates(directory=Path(__file__).parent / "templates")
+
+# Compiled templates stay cached for the life of the process; only re-check
+# the template files for changes while developing
+templates.env.auto_reload = DEBUG
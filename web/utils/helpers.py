@@ -35,63 +35,66 @@ def parse_json_field(value):
         return []
 
 
+def _epic_store_url(data):
+    """Epic product page from the slug in extra_data, or a store search by name."""
+    product_slug = data.get("product_slug")
+    if product_slug:
+        return f"https://store.epicgames.com/en-US/p/{product_slug}"
+    # Fallback: search the Epic Store by game name
+    name = data.get("name")
+    if name:
+        return f"https://store.epicgames.com/en-US/browse?q={quote(name)}&sortBy=relevancy"
+    return None
+
+
+def _humble_store_url(data):
+    """Humble Bundle downloads page for the order's gamekey."""
+    gamekey = data.get("gamekey")
+    if gamekey:
+        return f"https://www.humblebundle.com/downloads?key={gamekey}"
+    return None
+
+
+# Stores whose URL is built from the store ID alone
+_STORE_ID_URL_TEMPLATES = {
+    "steam": "https://store.steampowered.com/app/{}",
+    "gog": "https://www.gog.com/en/game/{}",  # GOG URLs use the product ID
+    "xbox": "https://www.xbox.com/games/store/game/{}",
+}
+
+# Stores that only have a library page to link to
+_STORE_LIBRARY_URLS = {
+    "battlenet": "https://account.battle.net/games",
+    "amazon": "https://gaming.amazon.com/home",
+}
+
+# Stores whose URL comes from extra_data
+_EXTRA_DATA_URL_BUILDERS = {
+    "epic": _epic_store_url,
+    "itch": lambda data: data.get("url"),  # Itch URLs are stored in extra_data
+    "humble": _humble_store_url,
+}
+
+
 def get_store_url(store, store_id, extra_data=None):
     """Generate the store URL for a game."""
     if not store_id:
         return None
 
-    if store == "steam":
-        return f"https://store.steampowered.com/app/{store_id}"
-    elif store == "epic":
-        # Try to use the product slug from extra_data (extracted from Epic metadata)
-        if extra_data:
-            try:
-                data = json.loads(extra_data) if isinstance(extra_data, str) else extra_data
-                product_slug = data.get("product_slug")
-                if product_slug:
-                    return f"https://store.epicgames.com/en-US/p/{product_slug}"
-                # Fallback: search the Epic Store by game name
-                name = data.get("name")
-                if name:
-                    return f"https://store.epicgames.com/en-US/browse?q={quote(name)}&sortBy=relevancy"
-            except (json.JSONDecodeError, TypeError):
-                pass
-        return None
-    elif store == "gog":
-        # GOG URLs use the product ID
-        return f"https://www.gog.com/en/game/{store_id}"
-    elif store == "itch":
-        # Itch URLs are stored in extra_data
-        if extra_data:
-            try:
-                data = json.loads(extra_data) if isinstance(extra_data, str) else extra_data
-                return data.get("url")
-            except (json.JSONDecodeError, TypeError):
-                pass
-        return None
-    elif store == "humble":
-        # Humble Bundle URLs - link to downloads page with gamekey
-        if extra_data:
-            try:
-                data = json.loads(extra_data) if isinstance(extra_data, str) else extra_data
-                gamekey = data.get("gamekey")
-                if gamekey:
-                    return f"https://www.humblebundle.com/downloads?key={gamekey}"
-            except (json.JSONDecodeError, TypeError):
-                pass
+    template = _STORE_ID_URL_TEMPLATES.get(store)
+    if template:
+        return template.format(store_id)
+    if store in _STORE_LIBRARY_URLS:
+        return _STORE_LIBRARY_URLS[store]
+
+    build_url = _EXTRA_DATA_URL_BUILDERS.get(store)
+    if build_url is None or not extra_data:
         return None
-    elif store == "battlenet":
-        # Battle.net - link to account games page
-        return "https://account.battle.net/games"
-    elif store == "amazon":
-        # Amazon Games - link to game library
-        return "https://gaming.amazon.com/home"
-    elif store == "xbox":
-        # Xbox Store URL
-        if store_id:
-            return f"https://www.xbox.com/games/store/game/{store_id}"
+    try:
+        data = json.loads(extra_data) if isinstance(extra_data, str) else extra_data
+        return build_url(data)
+    except (json.JSONDecodeError, TypeError):
         return None
-    return None
 
 
 def group_games_by_igdb(games):